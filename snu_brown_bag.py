@@ -4,17 +4,220 @@ import pandas as pd
 import smtplib
 import time
 import os
+import csv
+import hashlib
+import hmac
+import io
+import itertools
+import logging
+import math
+import multiprocessing
+import queue
+import re
+import threading
+import uuid
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from email.mime.text import MIMEText
-from datetime import datetime, time as dt_time
+from xml.sax.saxutils import escape
+from datetime import datetime, timedelta, date as dt_date, time as dt_time
 from fpdf import FPDF
 import plotly.express as px
+from streamlit.errors import StreamlitAPIException
+
+import snu_charts
 
 # --- 1. DATABASE SETUP ---
 
+DB_PATH = os.environ.get("SNU_DB_PATH", "ssn_research.db")
 
-def init_db():
-    conn = sqlite3.connect("ssn_research.db")
-    c = conn.cursor()
+
+class _CountingCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        pool = self.connection.pool
+        if pool is not None:
+            pool._count_query()
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        pool = self.connection.pool
+        if pool is not None:
+            pool._count_query()
+        return super().executemany(sql, seq_of_parameters)
+
+
+class _PooledConnection(sqlite3.Connection):
+    # Set once the connection is tuned, so setup pragmas are not counted.
+    pool = None
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    """Process-wide pool of tuned SQLite connections.
+
+    Connections are opened lazily, handed to one thread at a time and kept
+    open between reruns, so the per-connection prepared statement cache and
+    the page cache stay warm.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-16000",
+        "PRAGMA mmap_size=67108864",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, path, max_idle=8, cached_statements=256):
+        self.path = path
+        self.max_idle = max_idle
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.queries_executed = 0
+
+    def _count_query(self):
+        with self._lock:
+            self.queries_executed += 1
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            factory=_PooledConnection,
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        conn.pool = self
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._idle.qsize() < self.max_idle:
+                self._idle.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            # Take the write lock up front: DDL is then atomic too, and a
+            # read-then-write block cannot fail to upgrade its snapshot.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def read_sql(self, sql, params=()):
+        with self.connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def fetchone(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def execute(self, sql, params=()):
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "queries_executed": self.queries_executed,
+                "idle_connections": self._idle.qsize(),
+            }
+
+
+@st.cache_resource
+def get_pool():
+    return ConnectionPool(DB_PATH)
+
+
+# 🔹 SCHEDULE CHOICES offered by the forms and accepted by the importer
+
+TIME_SLOTS = [
+    dt_time(h, m).strftime("%I:%M %p") for h in range(8, 20) for m in (0, 15, 30, 45)
+]
+DESIGNATIONS = ["Faculty", "Scholar", "Student"]
+
+
+# "2024-03-01" + "01:30 PM" -> "2024-03-01 13:30", which sorts correctly as
+# text. TIME_SLOTS always renders as zero-padded "%I:%M %p".
+START_TS_SQL = """CASE WHEN {time} IS NULL OR {time} = '' THEN {date}
+    ELSE {date} || ' ' || printf('%02d:%s',
+        CAST(substr({time}, 1, 2) AS INTEGER) % 12
+            + CASE WHEN upper(substr({time}, 7, 2)) = 'PM' THEN 12 ELSE 0 END,
+        substr({time}, 4, 2))
+    END"""
+
+# Minutes for each DURATIONS choice, in Python and as SQL.
+DURATION_MINUTES = {
+    "30 mins": 30,
+    "45 mins": 45,
+    "1 hour": 60,
+    "1.5 hours": 90,
+    "2 hours": 120,
+}
+DURATION_MINUTES_SQL = (
+    "CASE {duration} "
+    + " ".join(f"WHEN '{label}' THEN {n}" for label, n in DURATION_MINUTES.items())
+    + " ELSE 0 END"
+)
+DURATIONS = list(DURATION_MINUTES)
+
+# Same format as start_ts; NULL when there is no start time to count from.
+END_TS_SQL = """CASE WHEN {time} IS NULL OR {time} = '' THEN NULL
+    ELSE strftime('%Y-%m-%d %H:%M', {start}, '+' || ({minutes}) || ' minutes')
+    END"""
+
+
+def end_ts_sql(date, time, duration):
+    return END_TS_SQL.format(
+        time=time,
+        start=START_TS_SQL.format(date=date, time=time),
+        minutes=DURATION_MINUTES_SQL.format(duration=duration),
+    )
+
+
+# --- MIGRATIONS ---
+# Each migration runs once, in order, inside its own transaction, and bumps
+# PRAGMA user_version. Append new migrations; never edit an applied one.
+
+
+def _migrate_base_schema(c):
     c.execute(
         """CREATE TABLE IF NOT EXISTS departments 
                  (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, 
@@ -42,45 +245,1594 @@ def init_db():
                   done_by TEXT,
                   action_time TEXT)"""
     )
+    # 🔹 DATA VERSION: bumped by triggers on every write that changes
+    # the presentations dataset, so cached reads know when to reload.
+
+    c.execute(
+        """CREATE TABLE IF NOT EXISTS meta
+                 (key TEXT PRIMARY KEY, value INTEGER)"""
+    )
+    c.execute(
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)"
+    )
+    for table in ("presentations", "departments"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            c.execute(
+                f"""CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version
+                     AFTER {event} ON {table}
+                     BEGIN
+                         UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+                     END"""
+            )
+
+    # 🔹 SORTABLE START TIMESTAMP + SCHEDULE INDEXES
+
+    c.execute("ALTER TABLE presentations ADD COLUMN start_ts TEXT")
+    c.execute(
+        "UPDATE presentations SET start_ts = "
+        + START_TS_SQL.format(date="date", time="time")
+    )
+    for event in ("INSERT", "UPDATE OF date, time"):
+        c.execute(
+            f"""CREATE TRIGGER presentations_start_ts_{event.split()[0].lower()}
+                 AFTER {event} ON presentations
+                 BEGIN
+                     UPDATE presentations
+                     SET start_ts = {START_TS_SQL.format(date="NEW.date", time="NEW.time")}
+                     WHERE id = NEW.id;
+                 END"""
+        )
+    c.execute(
+        "CREATE INDEX idx_presentations_start_ts ON presentations (start_ts)"
+    )
+    c.execute(
+        "CREATE INDEX idx_presentations_dept_start ON presentations (dept_id, start_ts)"
+    )
+
+
+def _migrate_search_index(c):
+    # External-content FTS5 index over the searchable text columns, kept in
+    # step with presentations by triggers.
+    c.execute(
+        """CREATE VIRTUAL TABLE presentations_fts USING fts5(
+                 title, abstract, presenter, guide_name,
+                 content='presentations', content_rowid='id',
+                 tokenize='unicode61 remove_diacritics 2')"""
+    )
+    c.execute(
+        """CREATE TRIGGER presentations_fts_insert AFTER INSERT ON presentations
+             BEGIN
+                 INSERT INTO presentations_fts (rowid, title, abstract, presenter, guide_name)
+                 VALUES (NEW.id, NEW.title, NEW.abstract, NEW.presenter, NEW.guide_name);
+             END"""
+    )
+    c.execute(
+        """CREATE TRIGGER presentations_fts_delete AFTER DELETE ON presentations
+             BEGIN
+                 INSERT INTO presentations_fts
+                     (presentations_fts, rowid, title, abstract, presenter, guide_name)
+                 VALUES ('delete', OLD.id, OLD.title, OLD.abstract, OLD.presenter, OLD.guide_name);
+             END"""
+    )
+    c.execute(
+        """CREATE TRIGGER presentations_fts_update
+             AFTER UPDATE OF title, abstract, presenter, guide_name ON presentations
+             BEGIN
+                 INSERT INTO presentations_fts
+                     (presentations_fts, rowid, title, abstract, presenter, guide_name)
+                 VALUES ('delete', OLD.id, OLD.title, OLD.abstract, OLD.presenter, OLD.guide_name);
+                 INSERT INTO presentations_fts (rowid, title, abstract, presenter, guide_name)
+                 VALUES (NEW.id, NEW.title, NEW.abstract, NEW.presenter, NEW.guide_name);
+             END"""
+    )
+    c.execute("INSERT INTO presentations_fts (presentations_fts) VALUES ('rebuild')")
+
+
+def _migrate_broadcast_queue(c):
+    c.execute(
+        """CREATE TABLE broadcast_jobs
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  subject TEXT,
+                  body TEXT,
+                  sender_email TEXT,
+                  status TEXT NOT NULL DEFAULT 'pending',
+                  error TEXT,
+                  created_at TEXT,
+                  finished_at TEXT)"""
+    )
+    c.execute(
+        """CREATE TABLE broadcast_deliveries
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  job_id INTEGER NOT NULL REFERENCES broadcast_jobs (id),
+                  recipient TEXT NOT NULL,
+                  status TEXT NOT NULL DEFAULT 'pending',
+                  attempts INTEGER NOT NULL DEFAULT 0,
+                  next_attempt_at REAL NOT NULL DEFAULT 0,
+                  error TEXT,
+                  UNIQUE (job_id, recipient))"""
+    )
+    c.execute("CREATE INDEX idx_broadcast_jobs_status ON broadcast_jobs (status)")
+
+
+def _migrate_report_runs(c):
+    c.execute(
+        """CREATE TABLE report_runs
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  data_key TEXT NOT NULL,
+                  status TEXT NOT NULL DEFAULT 'pending',
+                  requested_at TEXT,
+                  finished_at TEXT,
+                  duration_ms REAL,
+                  size_bytes INTEGER,
+                  error TEXT,
+                  pdf BLOB)"""
+    )
+    c.execute("CREATE INDEX idx_report_runs_key ON report_runs (data_key, status)")
+
+
+def _migrate_report_appendix(c):
+    c.execute("ALTER TABLE report_runs ADD COLUMN appendix INTEGER NOT NULL DEFAULT 0")
+
+
+# table -> (key column, key expression over a presentations row)
+ROLLUPS = {
+    "rollup_dept": ("dept_id", "{row}.dept_id"),
+    "rollup_month": ("month", "substr({row}.date, 1, 7)"),
+    "rollup_year": ("year", "CAST(substr({row}.date, 1, 4) AS INTEGER)"),
+    "rollup_designation": ("designation", "COALESCE({row}.designation, '')"),
+    "rollup_presenter": ("presenter", "COALESCE({row}.presenter, '')"),
+}
+
+
+def _migrate_rollups(c):
+    # Per-group presentation counts, kept current by triggers so analytics
+    # read O(groups) rows instead of aggregating the whole table.
+    inc, dec = [], []
+    for table, (key, expr) in ROLLUPS.items():
+        c.execute(
+            f"CREATE TABLE {table} ({key} PRIMARY KEY NOT NULL, n INTEGER NOT NULL)"
+        )
+        c.execute(
+            f"INSERT INTO {table} SELECT {expr.format(row='p')}, COUNT(*) "
+            f"FROM presentations p WHERE {expr.format(row='p')} IS NOT NULL GROUP BY 1"
+        )
+        inc.append(
+            f"""INSERT INTO {table} ({key}, n)
+                SELECT {expr.format(row='NEW')}, 1 WHERE {expr.format(row='NEW')} IS NOT NULL
+                ON CONFLICT ({key}) DO UPDATE SET n = n + 1;"""
+        )
+        dec.append(
+            f"""UPDATE {table} SET n = n - 1 WHERE {key} = {expr.format(row='OLD')};
+                DELETE FROM {table} WHERE {key} = {expr.format(row='OLD')} AND n <= 0;"""
+        )
+    inc, dec = "\n".join(inc), "\n".join(dec)
+    c.execute(
+        f"CREATE TRIGGER presentations_rollup_insert AFTER INSERT ON presentations BEGIN {inc} END"
+    )
+    c.execute(
+        f"CREATE TRIGGER presentations_rollup_delete AFTER DELETE ON presentations BEGIN {dec} END"
+    )
+    c.execute(
+        f"""CREATE TRIGGER presentations_rollup_update
+             AFTER UPDATE OF date, designation, dept_id, presenter ON presentations
+             BEGIN {dec} {inc} END"""
+    )
+
+
+def _migrate_venue_slots(c):
+    # Every booking as a (venue, start_ts, end_ts) interval, so overlap
+    # checks are an index range seek. Venues match case- and
+    # whitespace-insensitively via an expression index.
+    c.execute("ALTER TABLE presentations ADD COLUMN end_ts TEXT")
+    c.execute(
+        "UPDATE presentations SET end_ts = " + end_ts_sql("date", "time", "duration")
+    )
+    for event in ("INSERT", "UPDATE OF date, time, duration"):
+        c.execute(
+            f"""CREATE TRIGGER presentations_end_ts_{event.split()[0].lower()}
+                 AFTER {event} ON presentations
+                 BEGIN
+                     UPDATE presentations
+                     SET end_ts = {end_ts_sql("NEW.date", "NEW.time", "NEW.duration")}
+                     WHERE id = NEW.id;
+                 END"""
+        )
+    c.execute(
+        """CREATE INDEX idx_presentations_venue_slot
+           ON presentations (lower(trim(venue_hall)), start_ts, end_ts)"""
+    )
+
+
+def _migrate_password_hashes(c):
+    # Replace the plaintext department passwords with scrypt hashes and move
+    # the admin password out of the code. The admin account starts from
+    # SNU_ADMIN_PASSWORD, or the old built-in password if that is unset.
+    c.execute("ALTER TABLE departments ADD COLUMN password_hash TEXT")
+    rows = c.execute(
+        "SELECT id, password FROM departments WHERE password IS NOT NULL"
+    ).fetchall()
+    c.executemany(
+        "UPDATE departments SET password_hash = ? WHERE id = ?",
+        [(hash_password(pw), dept_id) for dept_id, pw in rows],
+    )
+    # The plaintext column is deprecated and only emptied: DROP COLUMN needs
+    # SQLite 3.35+, older than many system builds Python links against.
+    c.execute("UPDATE departments SET password = NULL")
+    c.execute(
+        """CREATE TABLE credentials
+                 (account TEXT PRIMARY KEY, password_hash TEXT NOT NULL)"""
+    )
+    c.execute(
+        "INSERT INTO credentials (account, password_hash) VALUES ('admin', ?)",
+        (hash_password(os.environ.get("SNU_ADMIN_PASSWORD", "admin123")),),
+    )
+
+
+def _migrate_login_limits(c):
+    c.execute(
+        """CREATE TABLE login_buckets
+                 (key TEXT PRIMARY KEY,
+                  tokens REAL NOT NULL,
+                  updated_at REAL NOT NULL)"""
+    )
+    c.execute("CREATE INDEX idx_login_buckets_updated ON login_buckets (updated_at)")
+    # max_failures / lockout_seconds override LoginLimiter's defaults when set.
+    c.execute(
+        """CREATE TABLE login_accounts
+                 (account TEXT PRIMARY KEY,
+                  failures INTEGER NOT NULL DEFAULT 0,
+                  locked_until REAL NOT NULL DEFAULT 0,
+                  max_failures INTEGER,
+                  lockout_seconds INTEGER)"""
+    )
+
+
+def _migrate_activity_retention(c):
+    c.execute(
+        "CREATE INDEX idx_activity_logs_time ON activity_logs (action_time, id)"
+    )
+    # One row per month, action and department for log rows past retention.
+    c.execute(
+        """CREATE TABLE activity_log_months
+                 (month TEXT NOT NULL,
+                  action TEXT NOT NULL,
+                  dept_name TEXT NOT NULL,
+                  n INTEGER NOT NULL,
+                  PRIMARY KEY (month, action, dept_name)) WITHOUT ROWID"""
+    )
+    c.execute(
+        "INSERT INTO meta (key, value) VALUES ('log_retention_days', ?)",
+        (int(os.environ.get("SNU_LOG_RETENTION_DAYS", 180)),),
+    )
+    c.execute("INSERT INTO meta (key, value) VALUES ('logs_archived_at', 0)")
+
+
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_search_index,
+    _migrate_broadcast_queue,
+    _migrate_report_runs,
+    _migrate_report_appendix,
+    _migrate_rollups,
+    _migrate_venue_slots,
+    _migrate_password_hashes,
+    _migrate_login_limits,
+    _migrate_activity_retention,
+]
 
-    conn.commit()
-    conn.close()
+
+def run_migrations(conn):
+    """Bring the database behind ``conn`` up to ``len(MIGRATIONS)``.
+
+    Works on any sqlite3 connection, so a temporary database file can be
+    migrated in isolation. Returns the resulting schema version.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target, migration in enumerate(MIGRATIONS, start=1):
+        if target <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock.
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if target > version:
+                migration(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {target}")
+                version = target
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return version
+
+
+@st.cache_resource
+def init_db():
+    # Cached per process: after the first run no DDL, not even the
+    # user_version check, is executed on rerun.
+    with get_pool().connection() as conn:
+        return run_migrations(conn)
+
+
+def get_data_version(conn):
+    return conn.execute(
+        "SELECT value FROM meta WHERE key = 'data_version'"
+    ).fetchone()[0]
+
+
+def current_data_version():
+    with get_pool().connection() as conn:
+        return get_data_version(conn)
+
+
+class PresentationDataset:
+    """Shared presentations ⨝ departments frame, reloaded only on change.
+
+    The frame is handed out without copying, so callers must treat it as
+    read-only.
+    """
+
+    QUERY = "SELECT p.*, d.name as Dept FROM presentations p JOIN departments d ON p.dept_id = d.id"
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self.version = None
+        self.df = None
+
+    def snapshot(self):
+        # (data_version, frame) taken together, for consumers that key
+        # derived artifacts on the version.
+        with self.pool.connection() as conn:
+            version = get_data_version(conn)
+            with self._lock:
+                if version != self.version:
+                    # Read the counter and the rows from one snapshot.
+                    conn.execute("BEGIN")
+                    version = get_data_version(conn)
+                    self.df = pd.read_sql_query(self.QUERY, conn)
+                    conn.rollback()
+                    self.version = version
+                return self.version, self.df
+
+    def get(self):
+        return self.snapshot()[1]
+
+    @contextmanager
+    def writing(self):
+        """Write transaction whose effect is spliced into the cached frame.
+
+        Yields ``(conn, change)``; append the ids of inserted or updated
+        presentations to ``change["upserted"]`` and of deleted ones to
+        ``change["deleted"]``. On commit only those rows are re-read, so
+        the next get() needs no reload.
+        """
+        change = {"upserted": [], "deleted": []}
+        with self.pool.transaction() as conn:
+            before = get_data_version(conn)
+            yield conn, change
+            after = get_data_version(conn)
+            rows = None
+            if change["upserted"]:
+                ids = [int(i) for i in change["upserted"]]
+                rows = pd.read_sql_query(
+                    f"{self.QUERY} WHERE p.id IN ({', '.join('?' * len(ids))})",
+                    conn,
+                    params=ids,
+                )
+        self._patch(before, after, rows, change["deleted"])
+
+    def _patch(self, before, after, rows, deleted):
+        with self._lock:
+            # A cache that was already behind would be patched into a wrong
+            # state; leave it to reload on next use instead.
+            if self.df is None or self.version != before:
+                return
+            replaced = list(deleted) + ([] if rows is None else rows["id"].tolist())
+            df = self.df[~self.df["id"].isin(replaced)]
+            if rows is not None and not rows.empty:
+                df = pd.concat([df, rows], ignore_index=True)
+            self.df = df
+            self.version = after
+
+
+@st.cache_resource
+def get_dataset():
+    return PresentationDataset(get_pool())
+
+
+def read_rollups(pool):
+    # (data_version, {name: frame}) read from one snapshot.
+    with pool.connection() as conn:
+        conn.execute("BEGIN")
+        version = get_data_version(conn)
+        rollups = {
+            "dept": pd.read_sql_query(
+                """SELECT d.name AS Dept, r.n AS count
+                   FROM rollup_dept r JOIN departments d ON d.id = r.dept_id
+                   ORDER BY r.n DESC, d.name""",
+                conn,
+            ),
+            "month": pd.read_sql_query(
+                "SELECT month, n FROM rollup_month ORDER BY month", conn
+            ),
+            "year": pd.read_sql_query(
+                "SELECT year, n FROM rollup_year ORDER BY year", conn
+            ),
+            "designation": pd.read_sql_query(
+                "SELECT designation, n FROM rollup_designation WHERE designation != ''",
+                conn,
+            ),
+            "presenters": conn.execute(
+                "SELECT COUNT(*) FROM rollup_presenter WHERE presenter != ''"
+            ).fetchone()[0],
+        }
+        conn.rollback()
+    return version, rollups
 
 
 # --- 2. HELPERS ---
 
 
-def send_mail(subject, body, recipients, sender_email, app_password):
-    if not sender_email or not app_password:
-        return "Mail credentials missing."
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = sender_email
-    msg["To"] = ", ".join(recipients)
-    try:
-        server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
-        server.login(sender_email, app_password)
-        server.sendmail(sender_email, recipients, msg.as_string())
-        server.quit()
+class Mailer:
+    """Sends a broadcast over one authenticated SMTP session.
+
+    ``mode="individual"`` sends one message per recipient so addresses are
+    never exposed to each other; ``mode="bcc"`` sends ``batch_size``
+    recipients per message via the envelope only. Messages are throttled to
+    ``rate`` per second, and ``send`` reports the outcome per recipient.
+    The session and throttle carry over between ``send`` calls until
+    ``close``.
+    """
+
+    def __init__(
+        self,
+        sender_email,
+        app_password,
+        host=None,
+        port=None,
+        use_ssl=None,
+        rate=None,
+        mode="individual",
+        batch_size=50,
+        timeout=30,
+    ):
+        self.sender_email = sender_email
+        self.app_password = app_password
+        self.host = host or os.environ.get("SNU_SMTP_HOST", "smtp.gmail.com")
+        self.port = int(port or os.environ.get("SNU_SMTP_PORT", 465))
+        if use_ssl is None:
+            use_ssl = os.environ.get("SNU_SMTP_SSL", "1") != "0"
+        self.use_ssl = use_ssl
+        self.rate = float(rate or os.environ.get("SNU_MAIL_RATE", 5))
+        self.mode = mode
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._server = None
+        self._next_send = 0.0
+
+    def _connect(self):
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if server.has_extn("auth"):
+            server.login(self.sender_email, self.app_password)
+        self._server = server
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except smtplib.SMTPException:
+                pass
+            self._server = None
+
+    def _throttle(self):
+        now = time.monotonic()
+        if now < self._next_send:
+            time.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + 1.0 / self.rate
+
+    def _send_one(self, subject, body, to_header, envelope):
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.sender_email
+        msg["To"] = to_header
+        payload = msg.as_string()
+        self._throttle()
+        for attempt in (1, 2):
+            if self._server is None:
+                self._connect()
+            try:
+                return self._server.sendmail(self.sender_email, envelope, payload)
+            except smtplib.SMTPServerDisconnected:
+                # Idle or per-connection limit hit: reconnect once.
+                self._server = None
+                if attempt == 2:
+                    raise
+
+    @staticmethod
+    def clean_recipients(recipients):
+        return list(dict.fromkeys(r.strip() for r in recipients if r and r.strip()))
+
+    def send(self, subject, body, recipients):
+        # Returns {recipient: None on success, otherwise the error text}.
+        recipients = self.clean_recipients(recipients)
+        if self.mode == "bcc":
+            chunks = [
+                recipients[i : i + self.batch_size]
+                for i in range(0, len(recipients), self.batch_size)
+            ]
+        else:
+            chunks = [[r] for r in recipients]
+
+        results = {}
+        for chunk in chunks:
+            to_header = chunk[0] if self.mode != "bcc" else self.sender_email
+            try:
+                refused = self._send_one(subject, body, to_header, chunk)
+            except smtplib.SMTPRecipientsRefused as e:
+                refused = e.recipients
+            except smtplib.SMTPAuthenticationError as e:
+                # Nothing further can succeed with these credentials.
+                for r in recipients:
+                    results.setdefault(r, f"Auth Error: {e.smtp_error!r}")
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                if self._server is None:
+                    # Could not (re)connect: fail the rest fast.
+                    for r in recipients:
+                        results.setdefault(r, f"Mail Error: {e}")
+                    break
+                if isinstance(e, smtplib.SMTPResponseException):
+                    refused = {r: (e.smtp_code, e.smtp_error) for r in chunk}
+                else:
+                    refused = {r: str(e) for r in chunk}
+            for r in chunk:
+                results[r] = self._describe(refused[r]) if r in refused else None
+        return results
+
+    @staticmethod
+    def _describe(reply):
+        # Server replies are (code, message). 5xx codes are permanent and
+        # marked "Rejected" so the worker does not retry them.
+        if not isinstance(reply, tuple):
+            return str(reply)
+        code, message = reply
+        if isinstance(message, bytes):
+            message = message.decode(errors="replace")
+        return f"{'Rejected' if 500 <= code < 600 else 'Deferred'} {code}: {message}"
+
+
+class BroadcastWorker:
+    """Background sender for broadcasts queued in ``broadcast_jobs``.
+
+    Deliveries are persisted per recipient, so a restart resumes where it
+    stopped. Permanent (5xx) refusals fail at once; other failures are
+    retried with exponential backoff up to ``MAX_ATTEMPTS``. App passwords are held in memory only: a job left
+    without one (e.g. after a restart) is paused until an admin resumes it,
+    unless ``SNU_SMTP_PASSWORD`` is set.
+    """
+
+    MAX_ATTEMPTS = 5
+    BASE_DELAY = 30.0
+    BATCH_SIZE = 25
+    LEASE = 300.0
+
+    def __init__(self, pool, poll_interval=2.0):
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self._credentials = {}
+        self._mailers = {}
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="broadcast-worker", daemon=True
+        )
+        self._thread.start()
+
+    def enqueue(self, subject, body, recipients, sender_email, app_password):
+        recipients = Mailer.clean_recipients(recipients)
+        with self.pool.transaction() as conn:
+            job_id = conn.execute(
+                """INSERT INTO broadcast_jobs (subject, body, sender_email, status, created_at)
+                   VALUES (?, ?, ?, 'pending', ?)""",
+                (
+                    subject,
+                    body,
+                    sender_email,
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                ),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO broadcast_deliveries (job_id, recipient) VALUES (?, ?)",
+                [(job_id, r) for r in recipients],
+            )
+        self._credentials[job_id] = app_password
+        self._wake.set()
+        return job_id
+
+    def resume(self, job_id, app_password):
+        self._credentials[job_id] = app_password
+        self.pool.execute(
+            "UPDATE broadcast_jobs SET status = 'pending', error = NULL WHERE id = ? AND status = 'paused'",
+            (job_id,),
+        )
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                busy = self._tick()
+            except Exception:
+                logging.getLogger(__name__).exception("Broadcast worker failed")
+                busy = False
+            if not busy:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _mailer(self, job_id, sender_email, password):
+        # One Mailer, so one SMTP login and throttle, per job across ticks.
+        mailer = self._mailers.get(job_id)
+        if mailer is None or mailer.app_password != password:
+            self._release(job_id)
+            mailer = self._mailers[job_id] = Mailer(sender_email, password)
+        return mailer
+
+    def _release(self, job_id):
+        mailer = self._mailers.pop(job_id, None)
+        if mailer is not None:
+            mailer.close()
+
+    def _tick(self):
+        now = time.time()
+        with self.pool.transaction() as conn:
+            conn.execute(
+                """UPDATE broadcast_jobs SET status = 'done', finished_at = ?
+                   WHERE status IN ('pending', 'running')
+                     AND NOT EXISTS (SELECT 1 FROM broadcast_deliveries d
+                                     WHERE d.job_id = broadcast_jobs.id AND d.status = 'pending')""",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),),
+            )
+            active = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM broadcast_jobs WHERE status IN ('pending', 'running')"
+                )
+            }
+        # Sessions of finished or paused jobs are closed here.
+        for job_id in set(self._mailers) - active:
+            self._release(job_id)
+
+        with self.pool.transaction() as conn:
+            job = conn.execute(
+                """SELECT j.id, j.subject, j.body, j.sender_email FROM broadcast_jobs j
+                   WHERE j.status IN ('pending', 'running')
+                     AND EXISTS (SELECT 1 FROM broadcast_deliveries d
+                                 WHERE d.job_id = j.id AND d.status = 'pending'
+                                   AND d.next_attempt_at <= ?)
+                   ORDER BY j.id LIMIT 1""",
+                (now,),
+            ).fetchone()
+            if job is None:
+                return False
+            job_id, subject, body, sender_email = job
+            password = self._credentials.get(job_id) or os.environ.get(
+                "SNU_SMTP_PASSWORD"
+            )
+            if not password:
+                conn.execute(
+                    "UPDATE broadcast_jobs SET status = 'paused', error = ? WHERE id = ?",
+                    ("App password needed to resume.", job_id),
+                )
+                return True
+            due = conn.execute(
+                """SELECT id, recipient, attempts FROM broadcast_deliveries
+                   WHERE job_id = ? AND status = 'pending' AND next_attempt_at <= ?
+                   ORDER BY id LIMIT ?""",
+                (job_id, now, self.BATCH_SIZE),
+            ).fetchall()
+            # Lease the batch so a second worker process skips it.
+            conn.executemany(
+                "UPDATE broadcast_deliveries SET next_attempt_at = ? WHERE id = ?",
+                [(now + self.LEASE, d[0]) for d in due],
+            )
+            conn.execute(
+                "UPDATE broadcast_jobs SET status = 'running' WHERE id = ?", (job_id,)
+            )
+
+        results = self._mailer(job_id, sender_email, password).send(
+            subject, body, [d[1] for d in due]
+        )
+
+        if results and all(
+            (err or "").startswith("Auth Error") for err in results.values()
+        ):
+            self._credentials.pop(job_id, None)
+            self._release(job_id)
+            with self.pool.transaction() as conn:
+                conn.execute(
+                    "UPDATE broadcast_jobs SET status = 'paused', error = ? WHERE id = ?",
+                    (next(iter(results.values())), job_id),
+                )
+                conn.executemany(
+                    "UPDATE broadcast_deliveries SET next_attempt_at = 0 WHERE id = ?",
+                    [(d[0],) for d in due],
+                )
+            return True
+
+        updates = []
+        for delivery_id, recipient, attempts in due:
+            err = results.get(recipient)
+            attempts += 1
+            if err is None:
+                updates.append(("sent", attempts, 0, None, delivery_id))
+            elif attempts >= self.MAX_ATTEMPTS or err.startswith("Rejected"):
+                updates.append(("failed", attempts, 0, err, delivery_id))
+            else:
+                retry_at = time.time() + self.BASE_DELAY * 2 ** (attempts - 1)
+                updates.append(("pending", attempts, retry_at, err, delivery_id))
+        with self.pool.transaction() as conn:
+            conn.executemany(
+                """UPDATE broadcast_deliveries
+                   SET status = ?, attempts = ?, next_attempt_at = ?, error = ?
+                   WHERE id = ?""",
+                updates,
+            )
         return True
-    except Exception as e:
-        return f"Mail Error: {str(e)}"
 
 
-def delayed_refresh(message, icon="✅"):
-    st.success(f"{icon} {message}")
-    time.sleep(1.2)
-    st.rerun()
+@st.cache_resource
+def get_broadcast_worker():
+    return BroadcastWorker(get_pool())
+
+
+def broadcast_progress():
+    return get_pool().read_sql(
+        """
+        SELECT j.id, j.created_at, j.status,
+               COALESCE(SUM(d.status = 'sent'), 0) AS sent,
+               COALESCE(SUM(d.status = 'failed'), 0) AS failed,
+               COALESCE(SUM(d.status = 'pending'), 0) AS pending,
+               j.error
+        FROM broadcast_jobs j
+        LEFT JOIN broadcast_deliveries d ON d.job_id = j.id
+        GROUP BY j.id
+        ORDER BY j.id DESC
+        LIMIT 10
+        """
+    )
+
+
+def flash_refresh(message, icon="✅", scope="app"):
+    # Rerun straight away; the confirmation rides along in session state
+    # and show_flash() displays it on the next run. Fragments pass
+    # scope="fragment" and call show_flash() themselves.
+    st.session_state["flash"] = (message, icon)
+    try:
+        st.rerun(scope=scope)
+    except StreamlitAPIException:
+        # A fragment drawn as part of a full run can only rerun the app.
+        st.rerun()
+
+
+def show_flash():
+    flash = st.session_state.pop("flash", None)
+    if flash:
+        message, icon = flash
+        st.toast(message, icon=icon)
+        st.success(f"{icon} {message}")
+
+
+# 🔹 CREDENTIALS: salted scrypt, stored as "scrypt$n$r$p$salt$digest" so the
+# cost parameters can be raised later without invalidating old hashes.
+
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2**14, 8, 1
+
+
+def hash_password(password, salt=None):
+    salt = salt or os.urandom(16)
+    digest = hashlib.scrypt(
+        password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32
+    )
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    try:
+        scheme, n, r, p, salt, digest = stored.split("$")
+        salt, digest = bytes.fromhex(salt), bytes.fromhex(digest)
+    except (AttributeError, ValueError):
+        return False
+    if scheme != "scrypt":
+        return False
+    candidate = hashlib.scrypt(
+        password.encode(), salt=salt, n=int(n), r=int(r), p=int(p), dklen=len(digest)
+    )
+    return hmac.compare_digest(candidate, digest)
+
+
+@st.cache_resource
+def decoy_hash():
+    # Checked against when an account does not exist, so a miss costs the
+    # same time as a wrong password and does not reveal which names exist.
+    return hash_password(os.urandom(16).hex())
+
+
+class LoginLimiter:
+    """Throttles login attempts, with all state in SQLite so it holds across
+    sessions, reruns and restarts.
+
+    Each attempt spends a token from two buckets, one for the account and
+    one for the browser session, refilled at ``RATE`` per second up to
+    ``BURST``. Independently, ``MAX_FAILURES`` wrong passwords in a row lock
+    the account for ``LOCKOUT`` seconds; both can be overridden per account
+    in ``login_accounts``.
+    """
+
+    BURST = 5
+    RATE = 1 / 20
+    MAX_FAILURES = 5
+    LOCKOUT = 300
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def attempt(self, account, session_key):
+        # Returns 0 if the attempt may go ahead (its tokens are spent), or
+        # the number of seconds to wait.
+        now = time.time()
+        keys = (f"account:{account}", f"session:{session_key}")
+        with self.pool.transaction() as conn:
+            row = conn.execute(
+                "SELECT locked_until FROM login_accounts WHERE account = ?", (account,)
+            ).fetchone()
+            if row and row[0] > now:
+                return row[0] - now
+
+            levels = []
+            for key in keys:
+                bucket = conn.execute(
+                    "SELECT tokens, updated_at FROM login_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = bucket or (self.BURST, now)
+                levels.append(min(self.BURST, tokens + (now - updated) * self.RATE))
+            wait = max((1 - t) / self.RATE for t in levels)
+            if wait > 0:
+                return wait
+
+            conn.executemany(
+                """INSERT INTO login_buckets (key, tokens, updated_at) VALUES (?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE
+                   SET tokens = excluded.tokens, updated_at = excluded.updated_at""",
+                [(key, t - 1, now) for key, t in zip(keys, levels)],
+            )
+            # Buckets idle long enough to be full again carry no state.
+            conn.execute(
+                "DELETE FROM login_buckets WHERE updated_at < ?",
+                (now - self.BURST / self.RATE,),
+            )
+        return 0
+
+    def record(self, account, ok):
+        with self.pool.transaction() as conn:
+            if ok:
+                conn.execute(
+                    "UPDATE login_accounts SET failures = 0 WHERE account = ?",
+                    (account,),
+                )
+                return
+            conn.execute(
+                """INSERT INTO login_accounts (account, failures) VALUES (?, 1)
+                   ON CONFLICT (account) DO UPDATE SET failures = failures + 1""",
+                (account,),
+            )
+            conn.execute(
+                """UPDATE login_accounts
+                   SET failures = 0,
+                       locked_until = ? + COALESCE(lockout_seconds, ?)
+                   WHERE account = ? AND failures >= COALESCE(max_failures, ?)""",
+                (time.time(), self.LOCKOUT, account, self.MAX_FAILURES),
+            )
+
+    def policy(self, account):
+        # (max_failures, lockout_seconds, locked_until) with defaults filled in.
+        row = self.pool.fetchone(
+            """SELECT max_failures, lockout_seconds, locked_until
+               FROM login_accounts WHERE account = ?""",
+            (account,),
+        ) or (None, None, 0)
+        return (
+            row[0] or self.MAX_FAILURES,
+            row[1] or self.LOCKOUT,
+            row[2],
+        )
+
+    def set_policy(self, account, max_failures, lockout_seconds, unlock=False):
+        with self.pool.transaction() as conn:
+            conn.execute(
+                """INSERT INTO login_accounts (account, max_failures, lockout_seconds)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT (account) DO UPDATE
+                   SET max_failures = excluded.max_failures,
+                       lockout_seconds = excluded.lockout_seconds""",
+                (account, int(max_failures), int(lockout_seconds)),
+            )
+            if unlock:
+                conn.execute(
+                    """UPDATE login_accounts SET failures = 0, locked_until = 0
+                       WHERE account = ?""",
+                    (account,),
+                )
+                conn.execute(
+                    "DELETE FROM login_buckets WHERE key = ?", (f"account:{account}",)
+                )
+
+
+@st.cache_resource
+def get_login_limiter():
+    return LoginLimiter(get_pool())
+
+
+def session_key():
+    # Random per browser session; the limiter's second bucket key.
+    if "client_id" not in st.session_state:
+        st.session_state["client_id"] = uuid.uuid4().hex
+    return st.session_state["client_id"]
+
+
+INVALID_LOGIN = "Invalid Credentials."
+
+
+def _limited_login(account, stored_hash, password):
+    # -> (ok, message). The limiter runs before any hashing, so rejected
+    # attempts cost one small transaction.
+    limiter = get_login_limiter()
+    wait = limiter.attempt(account, session_key())
+    if wait:
+        return False, f"Too many attempts. Try again in {math.ceil(wait)} s."
+    ok = verify_password(password, stored_hash or decoy_hash()) and bool(stored_hash)
+    limiter.record(account, ok)
+    return ok, None if ok else INVALID_LOGIN
+
+
+def department_login(name, password):
+    # -> (dept_id or None, error message or None). Reads just this
+    # department's hash.
+    row = get_pool().fetchone(
+        "SELECT id, password_hash FROM departments WHERE name = ?", (name,)
+    )
+    if row is None:
+        verify_password(password, decoy_hash())
+        return None, INVALID_LOGIN
+    ok, message = _limited_login(f"dept:{row[0]}", row[1], password)
+    return (row[0] if ok else None), message
+
+
+def admin_login(password):
+    # -> (ok, error message or None)
+    row = get_pool().fetchone(
+        "SELECT password_hash FROM credentials WHERE account = 'admin'"
+    )
+    return _limited_login("admin", row[0] if row else None, password)
+
+
+def set_admin_password(password):
+    get_pool().execute(
+        "UPDATE credentials SET password_hash = ? WHERE account = 'admin'",
+        (hash_password(password),),
+    )
+
+
+class AuthSession:
+    """A signed-in coordinator or admin, kept in session state.
+
+    Created once at login, so later runs key their queries on ``dept_id``
+    instead of resolving the department by name. ``dept_name`` is only for
+    display and activity logs.
+    """
+
+    TTL = {"coordinator": 8 * 3600, "admin": 3600}
+
+    def __init__(self, role, dept_id=None, dept_name=None):
+        self.role = role
+        self.dept_id = dept_id
+        self.dept_name = dept_name
+        self.expires_at = time.time() + self.TTL[role]
+
+    def valid(self):
+        return time.time() < self.expires_at
+
+
+def get_auth(key):
+    # The AuthSession stored under ``key``; expired ones are dropped.
+    auth = st.session_state.get(key)
+    if auth is not None and not auth.valid():
+        del st.session_state[key]
+        st.info("⏰ Your session expired. Please sign in again.")
+        return None
+    return auth
+
+
+# 🔹 FULL-TEXT SEARCH
+
+
+def fts_query(text):
+    # Quote every word so user input can never be parsed as FTS5 syntax;
+    # the trailing * makes each word a prefix match.
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+# Marks matched words in snippets. Control characters never occur in stored
+# text, so the markers survive markdown_escape and become ** afterwards.
+HIGHLIGHT_START, HIGHLIGHT_END = "\x02", "\x03"
+
+
+def markdown_escape(text):
+    # Backslash-escape all ASCII punctuation so stored text renders
+    # literally in st.markdown: no emphasis, links, images or :directives:.
+    return re.sub(r"([!-/:-@\[-`{-~])", r"\\\1", str(text))
+
+
+def highlight_markdown(snippet):
+    return (
+        markdown_escape(snippet)
+        .replace(HIGHLIGHT_START, "**")
+        .replace(HIGHLIGHT_END, "**")
+    )
+
+
+def search_presentations(text, limit=20):
+    match = fts_query(text)
+    if not match:
+        return pd.DataFrame()
+    # bm25 weights: title, abstract, presenter, guide_name
+    return get_pool().read_sql(
+        """
+        SELECT p.id, p.date, p.time, d.name as Dept, p.title, p.presenter,
+               p.designation, p.guide_name, p.venue_hall,
+               snippet(presentations_fts, 1, ?, ?, ' … ', 16) AS snippet
+        FROM presentations_fts
+        JOIN presentations p ON p.id = presentations_fts.rowid
+        JOIN departments d ON p.dept_id = d.id
+        WHERE presentations_fts MATCH ?
+        ORDER BY bm25(presentations_fts, 10.0, 1.0, 5.0, 3.0)
+        LIMIT ?
+        """,
+        params=(HIGHLIGHT_START, HIGHLIGHT_END, match, limit),
+    )
+
+
+# 🔹 PRESENTATION LISTINGS: filters pushed into SQL, keyset pagination
+
+PAGE_SIZE = 25
+
+
+def presentation_filter_sql(
+    before=None, dept_id=None, designation=None, date_from=None, date_to=None
+):
+    clauses, params = [], []
+    if before is not None:
+        clauses.append("p.start_ts < ?")
+        params.append(str(before))
+    if dept_id is not None:
+        clauses.append("p.dept_id = ?")
+        params.append(int(dept_id))
+    if designation:
+        clauses.append("p.designation = ?")
+        params.append(designation)
+    if date_from is not None:
+        clauses.append("p.start_ts >= ?")
+        params.append(str(date_from))
+    if date_to is not None:
+        clauses.append("p.start_ts < ?")
+        params.append(str(date_to + timedelta(days=1)))
+    return " AND ".join(clauses) or "1", tuple(params)
+
+
+def count_presentations(where, params):
+    return get_pool().fetchone(
+        f"SELECT COUNT(*) FROM presentations p WHERE {where}", params
+    )[0]
+
+
+def fetch_presentations_page(where, params, after=None, limit=PAGE_SIZE):
+    # Newest first. ``after`` is the (start_ts, id) of the previous page's
+    # last row, so each page is an index seek rather than an OFFSET scan.
+    # SQLite seeks on the first plain start_ts bound it finds and only
+    # filters on the row-value comparison, so the cursor's own bound goes
+    # ahead of the filters' (the Previous view always has one).
+    if after is not None:
+        where = f"p.start_ts <= ? AND ({where}) AND (p.start_ts, p.id) < (?, ?)"
+        params = (after[0], *params, *after)
+    return get_pool().read_sql(
+        f"""
+        SELECT p.id, p.date, p.time, d.name as Dept, p.title, p.presenter,
+               p.designation, p.guide_name, p.duration, p.venue_hall, p.start_ts
+        FROM presentations p
+        JOIN departments d ON p.dept_id = d.id
+        WHERE {where}
+        ORDER BY p.start_ts DESC, p.id DESC
+        LIMIT ?
+        """,
+        params=(*params, limit),
+    )
+
+
+# 🔹 ACTIVITY LOG: retention into monthly summaries, keyset-paginated reads
+
+LOG_ACTIONS = ["ADDED", "IMPORTED", "DELETED"]
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def get_meta(key):
+    row = get_pool().fetchone("SELECT value FROM meta WHERE key = ?", (key,))
+    return row[0] if row else None
+
+
+def archive_activity_logs(retention_days=None):
+    """Fold log rows older than the retention window into
+    ``activity_log_months`` and delete them. Returns the rows archived."""
+    if retention_days is None:
+        retention_days = get_meta("log_retention_days")
+    cutoff = (datetime.now() - timedelta(days=int(retention_days))).strftime(
+        LOG_TIME_FORMAT
+    )
+    with get_pool().transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO activity_log_months (month, action, dept_name, n)
+            SELECT substr(action_time, 1, 7), COALESCE(action, ''),
+                   COALESCE(dept_name, ''), COUNT(*)
+            FROM activity_logs
+            WHERE action_time < ?
+            GROUP BY 1, 2, 3
+            ON CONFLICT (month, action, dept_name) DO UPDATE SET n = n + excluded.n
+            """,
+            (cutoff,),
+        )
+        archived = conn.execute(
+            "DELETE FROM activity_logs WHERE action_time < ?", (cutoff,)
+        ).rowcount
+        conn.execute(
+            "UPDATE meta SET value = ? WHERE key = 'logs_archived_at'",
+            (int(time.time()),),
+        )
+    return archived
+
+
+def archive_activity_logs_daily():
+    # Cheap enough to call on every visit: one meta read unless a day has
+    # passed since the last archive run.
+    if time.time() - get_meta("logs_archived_at") >= 86400:
+        archive_activity_logs()
+
+
+def activity_filter_sql(action=None, dept_name=None, date_from=None, date_to=None):
+    clauses, params = [], []
+    if action:
+        clauses.append("action = ?")
+        params.append(action)
+    if dept_name:
+        clauses.append("dept_name = ?")
+        params.append(dept_name)
+    if date_from is not None:
+        clauses.append("action_time >= ?")
+        params.append(str(date_from))
+    if date_to is not None:
+        clauses.append("action_time < ?")
+        params.append(str(date_to + timedelta(days=1)))
+    return " AND ".join(clauses) or "1", tuple(params)
+
+
+def fetch_activity_page(where, params, after=None, limit=PAGE_SIZE):
+    # Newest first, keyset on (action_time, id) to walk
+    # idx_activity_logs_time. One extra row is fetched so callers can tell
+    # whether an older page exists without counting the table. As in
+    # fetch_presentations_page, the cursor's plain bound comes first so it
+    # is the one SQLite seeks on when a date range is also set.
+    if after is not None:
+        where = f"action_time <= ? AND ({where}) AND (action_time, id) < (?, ?)"
+        params = (after[0], *params, *after)
+    return get_pool().read_sql(
+        f"""
+        SELECT id, action_time, action, title, presenter, dept_name, done_by
+        FROM activity_logs
+        WHERE {where}
+        ORDER BY action_time DESC, id DESC
+        LIMIT ?
+        """,
+        params=(*params, limit + 1),
+    )
+
+
+# 🔹 VENUE CONFLICTS
+
+TS_FORMAT = "%Y-%m-%d %H:%M"
+MAX_DURATION = timedelta(minutes=max(DURATION_MINUTES.values()))
+
+
+def slot_bounds(date, time_str, duration):
+    start = datetime.strptime(f"{date} {time_str}", "%Y-%m-%d %I:%M %p")
+    return start, start + timedelta(minutes=DURATION_MINUTES.get(duration, 0))
+
+
+def _venue_bookings(conn, venue, start_from, start_to, exclude_id=None):
+    # (start, end) of bookings at ``venue`` starting strictly between the
+    # bounds. Matches idx_presentations_venue_slot.
+    rows = conn.execute(
+        """
+        SELECT p.id, p.title, p.presenter, p.start_ts, p.end_ts
+        FROM presentations p
+        WHERE lower(trim(p.venue_hall)) = lower(trim(?))
+          AND p.start_ts > ? AND p.start_ts < ?
+          AND p.end_ts IS NOT NULL
+          AND p.id != ?
+        ORDER BY p.start_ts
+        """,
+        (
+            venue,
+            start_from.strftime(TS_FORMAT),
+            start_to.strftime(TS_FORMAT),
+            -1 if exclude_id is None else int(exclude_id),
+        ),
+    ).fetchall()
+    return [
+        (
+            pid,
+            title,
+            presenter,
+            datetime.strptime(s, TS_FORMAT),
+            datetime.strptime(e, TS_FORMAT),
+        )
+        for pid, title, presenter, s, e in rows
+    ]
+
+
+def find_conflicts(conn, venue, start, end, exclude_id=None):
+    # Nothing runs longer than MAX_DURATION, so only bookings starting in
+    # (start - MAX_DURATION, end) can overlap [start, end).
+    if not venue or not venue.strip():
+        return []
+    return [
+        b
+        for b in _venue_bookings(conn, venue, start - MAX_DURATION, end, exclude_id)
+        if b[4] > start
+    ]
+
+
+def suggest_free_slots(
+    conn, venue, date, time_str, duration, slots, exclude_id=None, limit=3
+):
+    # Start times on the same day, nearest to the requested one first, that
+    # fit around the venue's bookings. One index range read for the day.
+    day = datetime.strptime(str(date), "%Y-%m-%d")
+    booked = _venue_bookings(
+        conn, venue, day - MAX_DURATION, day + timedelta(days=1), exclude_id
+    )
+    wanted = slot_bounds(date, time_str, duration)[0]
+    candidates = [slot_bounds(date, t, duration) + (t,) for t in slots]
+    candidates.sort(key=lambda c: abs(c[0] - wanted))
+    free = []
+    for start, end, slot in candidates:
+        if not any(b[3] < end and b[4] > start for b in booked):
+            free.append(slot)
+            if len(free) == limit:
+                break
+    return free
+
+
+# 🔹 BULK IMPORT
+
+IMPORT_COLUMNS = [
+    "presenter",
+    "designation",
+    "guide_name",
+    "title",
+    "abstract",
+    "date",
+    "time",
+    "duration",
+    "venue_hall",
+]
+IMPORT_REQUIRED = ["presenter", "designation", "title", "date", "time", "duration"]
+# Header spellings accepted besides the column names themselves.
+IMPORT_ALIASES = {
+    "presenter_name": "presenter",
+    "guide": "guide_name",
+    "supervisor": "guide_name",
+    "start_time": "time",
+    "venue": "venue_hall",
+}
+
+
+def _label_import_rows(rows):
+    header = next(rows, None) or ()
+    keys = []
+    for h in header:
+        key = re.sub(r"\W+", "_", str(h or "").strip().lower()).strip("_")
+        keys.append(IMPORT_ALIASES.get(key, key))
+    missing = [k for k in IMPORT_REQUIRED if k not in keys]
+    if missing:
+        raise ValueError("missing column(s): " + ", ".join(missing))
+    for line, values in enumerate(rows, start=2):
+        if any(v not in (None, "") for v in values):
+            yield line, dict(zip(keys, values))
+
+
+def iter_import_rows(name, data):
+    # (line number, {column: value}) one row at a time straight off the
+    # upload, so the file is never loaded into a DataFrame.
+    if name.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(data, read_only=True, data_only=True)
+        try:
+            yield from _label_import_rows(wb.active.iter_rows(values_only=True))
+        finally:
+            wb.close()
+    else:
+        text = io.TextIOWrapper(data, encoding="utf-8-sig", newline="")
+        try:
+            yield from _label_import_rows(csv.reader(text))
+        finally:
+            text.detach()
+
+
+def parse_import_row(row, today):
+    # -> (values in IMPORT_COLUMNS order, None) or (None, problem)
+    row = {k: "" if row.get(k) is None else row.get(k) for k in IMPORT_COLUMNS}
+    missing = [k for k in IMPORT_REQUIRED if not str(row[k]).strip()]
+    if missing:
+        return None, "missing " + ", ".join(missing)
+
+    # Excel cells arrive as datetime/time objects, CSV cells as text.
+    day = row["date"]
+    if isinstance(day, datetime):
+        day = day.date()
+    if not isinstance(day, dt_date):
+        try:
+            day = datetime.strptime(str(day).strip(), "%Y-%m-%d").date()
+        except ValueError:
+            return None, f"date '{day}' is not YYYY-MM-DD"
+    if day < today:
+        return None, f"date {day} is in the past"
+
+    slot = row["time"]
+    if isinstance(slot, datetime):
+        slot = slot.time()
+    if isinstance(slot, dt_time):
+        slot = slot.strftime("%I:%M %p")
+    else:
+        text = str(slot).strip().upper()
+        for fmt in ("%I:%M %p", "%H:%M", "%H:%M:%S"):
+            try:
+                slot = datetime.strptime(text, fmt).strftime("%I:%M %p")
+                break
+            except ValueError:
+                pass
+    if slot not in TIME_SLOTS:
+        return None, (
+            f"time '{row['time']}' is not a start slot "
+            f"({TIME_SLOTS[0]} to {TIME_SLOTS[-1]}, every 15 minutes)"
+        )
+
+    choices = {
+        "designation": DESIGNATIONS,
+        "duration": DURATIONS,
+    }
+    for key, options in choices.items():
+        match = [o for o in options if o.lower() == str(row[key]).strip().lower()]
+        if not match:
+            return None, f"{key} '{row[key]}' is not one of {', '.join(options)}"
+        row[key] = match[0]
+
+    row["date"], row["time"] = str(day), slot
+    return tuple(str(row[k]).strip() for k in IMPORT_COLUMNS), None
+
+
+def import_presentations(name, data, dept_id, dept_name, done_by):
+    """Validate an uploaded schedule and insert it in one transaction.
+
+    Returns ``(inserted, [(line, problem), ...])``. Rows with problems,
+    including venue clashes with existing bookings or earlier rows of the
+    same file, are skipped; the rest go in with executemany, each with its
+    own activity_logs entry.
+    """
+    today = dt_date.today()
+    accepted, problems = [], []
+    for line, row in iter_import_rows(name, data):
+        values, problem = parse_import_row(row, today)
+        if problem:
+            problems.append((line, problem))
+        else:
+            accepted.append((line, values))
+
+    with get_pool().transaction() as conn:
+        batch = {}  # venue -> [(start, end, title)] taken by this file
+        rows = []
+        for line, values in accepted:
+            title, day, slot, duration, venue = (values[i] for i in (3, 5, 6, 7, 8))
+            if venue:
+                start, end = slot_bounds(day, slot, duration)
+                taken = batch.setdefault(venue.lower(), [])
+                clashes = [c[1] for c in find_conflicts(conn, venue, start, end)]
+                clashes += [t for s, e, t in taken if s < end and e > start]
+                if clashes:
+                    problems.append(
+                        (line, f"{venue} is already booked then ({clashes[0]})")
+                    )
+                    continue
+                taken.append((start, end, title))
+            rows.append(values)
+
+        conn.executemany(
+            """
+            INSERT INTO presentations
+            (presenter, designation, guide_name, title, abstract, date, time, duration, venue_hall, dept_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(*values, dept_id) for values in rows],
+        )
+        stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.executemany(
+            """
+            INSERT INTO activity_logs
+            (action, title, presenter, dept_name, done_by, action_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [("IMPORTED", v[3], v[0], dept_name, done_by, stamp) for v in rows],
+        )
+    return len(rows), sorted(problems)
+
+
+# 🔹 EXPORTS: rows go from a SQLite cursor into the file in chunks, never
+# through a DataFrame, so building an export costs the same memory at any size.
+
+EXPORT_CHUNK = 1000
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+EXPORT_QUERIES = {
+    "presentations": """
+        SELECT p.date, p.time, d.name AS department, p.title, p.presenter,
+               p.designation, p.guide_name, p.duration, p.venue_hall, p.abstract
+        FROM presentations p
+        JOIN departments d ON p.dept_id = d.id
+        WHERE {where}
+        ORDER BY p.start_ts, p.id""",
+    "subscribers": "SELECT email FROM subscriptions ORDER BY id",
+    "activity_logs": """
+        SELECT action_time, action, title, presenter, dept_name, done_by
+        FROM activity_logs
+        ORDER BY id""",
+}
+
+
+def _write_csv(out, columns, rows):
+    # utf-8-sig so Excel opens non-ASCII names correctly.
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    while True:
+        chunk = list(itertools.islice(rows, EXPORT_CHUNK))
+        if not chunk:
+            break
+        writer.writerows(chunk)
+    text.detach()
+
+
+def _write_xlsx(out, sheet, columns, rows):
+    import xlsxwriter
+
+    # constant_memory flushes each row to a temp file as soon as the next
+    # one starts, instead of holding the whole sheet.
+    wb = xlsxwriter.Workbook(out, {"constant_memory": True})
+    ws = wb.add_worksheet(sheet[:31])
+    ws.write_row(0, 0, columns, wb.add_format({"bold": True}))
+    ws.set_column(0, len(columns) - 1, 18)
+    for i, row in enumerate(rows, start=1):
+        ws.write_row(i, 0, row)
+    wb.close()
+
+
+def export_table(pool, name, fmt="csv", where="1", params=()):
+    """Build the ``EXPORT_QUERIES[name]`` export as CSV or XLSX bytes.
+
+    Meant to be passed, wrapped in a lambda, as st.download_button's
+    ``data`` so the file is only built when someone clicks. That runs
+    outside the script thread, hence the explicit pool.
+    """
+    out = io.BytesIO()
+    with pool.connection() as conn:
+        cursor = conn.execute(EXPORT_QUERIES[name].format(where=where), params)
+        columns = [c[0] for c in cursor.description]
+        rows = _iter_cursor(cursor, EXPORT_CHUNK)
+        if fmt == "xlsx":
+            _write_xlsx(out, name, columns, rows)
+        else:
+            _write_csv(out, columns, rows)
+    return out
 
 
 # --- 3. ANALYTICS & PDF ENGINE ---
 
 
-def get_plots(df):
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Charts whose unfiltered data read_rollups already keeps, same columns.
+ROLLUP_CHARTS = ("dept", "designation", "month")
+
+
+def read_analytics(where, params, rollups=None):
+    # Every chart's data as GROUP BY results from one snapshot; only the
+    # aggregated points ever leave SQLite. ``where``/``params`` come from
+    # presentation_filter_sql. Unfiltered callers pass ``rollups`` from
+    # read_rollups, and the department, designation and month charts are
+    # taken from those instead of grouping the whole table.
+    queries = {
+        "dept": """
+            SELECT d.name AS Dept, COUNT(*) AS count
+            FROM presentations p JOIN departments d ON d.id = p.dept_id
+            WHERE {where}
+            GROUP BY p.dept_id ORDER BY count DESC, d.name""",
+        "designation": """
+            SELECT p.designation, COUNT(*) AS n
+            FROM presentations p
+            WHERE {where} AND p.designation != ''
+            GROUP BY p.designation""",
+        "month": """
+            SELECT substr(p.start_ts, 1, 7) AS month, COUNT(*) AS n
+            FROM presentations p
+            WHERE {where}
+            GROUP BY month ORDER BY month""",
+        # %w counts from Sunday = 0; shift so Monday = 0 like WEEKDAYS.
+        "heatmap": """
+            SELECT (CAST(strftime('%w', p.date) AS INTEGER) + 6) % 7 AS weekday,
+                   CAST(substr(p.start_ts, 12, 2) AS INTEGER) AS hour,
+                   COUNT(*) AS n
+            FROM presentations p
+            WHERE {where} AND length(p.start_ts) > 10
+            GROUP BY weekday, hour""",
+        "venue": """
+            SELECT MIN(trim(p.venue_hall)) AS venue, COUNT(*) AS sessions,
+                   ROUND(SUM(%s) / 60.0, 1) AS hours
+            FROM presentations p
+            WHERE {where} AND trim(p.venue_hall) != ''
+            GROUP BY lower(trim(p.venue_hall))
+            ORDER BY hours DESC, sessions DESC
+            LIMIT 15"""
+        % DURATION_MINUTES_SQL.format(duration="p.duration"),
+        "guides": """
+            SELECT p.guide_name AS Guide, COUNT(*) AS Presentations,
+                   COUNT(DISTINCT p.presenter) AS Presenters,
+                   MAX(p.date) AS Latest
+            FROM presentations p
+            WHERE {where} AND p.guide_name != ''
+            GROUP BY p.guide_name
+            ORDER BY Presentations DESC, Presenters DESC, Guide
+            LIMIT 10""",
+    }
+    if rollups is not None:
+        for name in ROLLUP_CHARTS:
+            del queries[name]
+    with get_pool().connection() as conn:
+        conn.execute("BEGIN")
+        analytics = {
+            name: pd.read_sql_query(sql.format(where=where), conn, params=params)
+            for name, sql in queries.items()
+        }
+        conn.rollback()
+    if rollups is not None:
+        analytics.update({name: rollups[name] for name in ROLLUP_CHARTS})
+    return analytics
+
+
+def get_plots(analytics):
     # Chart 1: Presentations per Department
 
     fig1 = px.bar(
-        df["Dept"].value_counts().reset_index(),
+        analytics["dept"],
         x="Dept",
         y="count",
         title="Presentations by Department",
@@ -89,15 +1841,143 @@ def get_plots(df):
     # Chart 2: Presenter Designation Distribution
 
     fig2 = px.pie(
-        df,
+        analytics["designation"],
         names="designation",
+        values="n",
         title="Presenter Roles",
         color_discrete_sequence=px.colors.qualitative.Pastel,
     )
-    return fig1, fig2
+    # Chart 3: Presentations per Month
+
+    fig3 = px.line(
+        analytics["month"],
+        x="month",
+        y="n",
+        markers=True,
+        title="Presentations per Month",
+        labels={"month": "Month", "n": "Presentations"},
+        color_discrete_sequence=["#003366"],
+    )
+    # Chart 4: Weekday x start hour. The grid is filled out in pandas, but
+    # only from the handful of aggregated cells SQLite returned.
+
+    grid = (
+        analytics["heatmap"]
+        .pivot(index="weekday", columns="hour", values="n")
+        .reindex(index=range(7), columns=range(8, 20))
+        .fillna(0)
+    )
+    fig4 = px.imshow(
+        grid.values,
+        x=[f"{h:02d}:00" for h in grid.columns],
+        y=WEEKDAYS,
+        aspect="auto",
+        color_continuous_scale="Blues",
+        labels={"x": "Start hour", "y": "Weekday", "color": "Presentations"},
+        title="When Talks Happen",
+    )
+    # Chart 5: Venue utilisation
+
+    fig5 = px.bar(
+        analytics["venue"],
+        x="hours",
+        y="venue",
+        orientation="h",
+        hover_data=["sessions"],
+        title="Venue Utilisation (hours booked)",
+        labels={"hours": "Hours", "venue": "Venue"},
+        color_discrete_sequence=["#003366"],
+    )
+    fig5.update_yaxes(autorange="reversed")
+    return fig1, fig2, fig3, fig4, fig5
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_analytics_figures(data_version, dept_id=None, date_from=None, date_to=None):
+    # Memoised on the data version and filters: while nothing changes,
+    # reruns reuse the built figures and skip the queries and plotly express
+    # entirely. Shared across sessions, so treat the results as read-only.
+    where, params = presentation_filter_sql(
+        dept_id=dept_id, date_from=date_from, date_to=date_to
+    )
+    rollups = None
+    if dept_id is None and date_from is None and date_to is None:
+        rollups = read_rollups(get_pool())[1]
+    analytics = read_analytics(where, params, rollups)
+    if analytics["dept"].empty:
+        return None
+    return get_plots(analytics), analytics["guides"]
+
+
+def _submit_chart(executor, spec):
+    if executor is not None:
+        try:
+            return executor.submit(snu_charts.render_chart, **spec)
+        except (BrokenProcessPool, RuntimeError):
+            pass
+    future = Future()
+    future.set_result(snu_charts.render_chart(**spec))
+    return future
+
+
+def _chart_result(future, spec):
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        # A dead worker should cost speed, not the report.
+        return snu_charts.render_chart(**spec)
+
+
+class _FlowableStream(list):
+    # ReportLab's build() consumes its flowables list from the front. This
+    # list tops itself up from a generator, so only a small window of
+    # flowables exists at any time, however long the report is.
+
+    def __init__(self, source, window=16):
+        super().__init__()
+        self._source = iter(source)
+        self._window = window
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._window:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
 
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
 
-def generate_pdf_report(df):
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def _table_chunks(header, rows, style, col_widths, rows_per_chunk=40):
+    # Long tables become a run of fixed-width tables with the header
+    # repeated, each of which can still split across a page break.
+    from reportlab.platypus import Table
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == rows_per_chunk:
+            yield Table([header] + chunk, colWidths=col_widths, repeatRows=1, style=style)
+            chunk = []
+    if chunk:
+        yield Table([header] + chunk, colWidths=col_widths, repeatRows=1, style=style)
+
+
+def _iter_cursor(cursor, size=500):
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def generate_pdf_report(rollups, chart_executor=None, pool=None, include_appendix=False):
 
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -106,34 +1986,26 @@ def generate_pdf_report(df):
     from reportlab.lib.units import inch
     from reportlab.pdfbase.ttfonts import TTFont
     from reportlab.pdfbase import pdfmetrics
-    import matplotlib.pyplot as plt
     import pandas as pd
     import numpy as np
-    import os
 
-    file_path = "institutional_analytics_report.pdf"
-    doc = SimpleDocTemplate(file_path, pagesize=A4)
-    elements = []
+    # Everything is built in memory, so concurrent reports never share files.
+    pdf_buffer = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, pageCompression=1)
 
     styles = getSampleStyleSheet()
+    cell_style = ParagraphStyle("Cell", parent=styles["BodyText"], fontSize=8, leading=10)
 
-    # ===============================
-    # EXECUTIVE SUMMARY PAGE
-    # ===============================
-
-    elements.append(Paragraph("<b>SNU Brown Bag Research Analytics Report</b>", styles["Title"]))
-    elements.append(Spacer(1, 0.3 * inch))
-
-    total_presentations = len(df)
-    total_departments = df["Dept"].nunique()
-    total_presenters = df["presenter"].nunique()
-
-    df["date"] = pd.to_datetime(df["date"])
-    df["Year"] = df["date"].dt.year
-    df["YearMonth"] = df["date"].dt.to_period("M").astype(str)
+    # All figures come from the rollup tables: O(groups), not O(talks).
+    dept_counts = rollups["dept"].rename(
+        columns={"Dept": "Department", "count": "Presentations"}
+    )
+    yearly_counts = rollups["year"].set_index("year")["n"]
+    monthly_counts = rollups["month"].set_index("month")["n"]
 
-    yearly_counts = df.groupby("Year").size()
-    monthly_counts = df.groupby("YearMonth").size()
+    total_presentations = int(dept_counts["Presentations"].sum())
+    total_departments = len(dept_counts)
+    total_presenters = rollups["presenters"]
 
     if len(yearly_counts) > 1:
         yoy_growth = round(yearly_counts.pct_change().iloc[-1] * 100, 2)
@@ -142,141 +2014,376 @@ def generate_pdf_report(df):
 
     intensity_index = round(total_presentations / total_departments, 2)
 
-    summary_data = [
-        ["Total Presentations", total_presentations],
-        ["Departments Engaged", total_departments],
-        ["Unique Presenters", total_presenters],
-        ["Research Intensity Index", intensity_index],
-        ["Year-over-Year Growth %", f"{yoy_growth}%"]
-    ]
+    # ===============================
+    # CHARTS: rendered concurrently while the tables are laid out
+    # ===============================
+
+    chart_specs = {
+        "Monthly trends": dict(
+            kind="bar",
+            labels=monthly_counts.index.tolist(),
+            values=monthly_counts.tolist(),
+            title="Monthly Presentation Trends",
+            color="#1f77b4",
+            rotate=45,
+        ),
+        "Department distribution": dict(
+            kind="bar",
+            labels=dept_counts["Department"].tolist(),
+            values=dept_counts["Presentations"].tolist(),
+            title="Department Distribution",
+            color="#ff7f0e",
+            rotate=45,
+        ),
+    }
+    if len(yearly_counts) > 1:
+        chart_specs["Yearly growth"] = dict(
+            kind="line",
+            labels=[int(y) for y in yearly_counts.index],
+            values=yearly_counts.tolist(),
+            title="Yearly Growth Trend",
+            color="green",
+        )
+
+    charts_start = time.perf_counter()
+    chart_futures = {
+        name: _submit_chart(chart_executor, spec) for name, spec in chart_specs.items()
+    }
+    chart_timings = {}
+
+    def chart_image(name):
+        png, seconds = _chart_result(chart_futures[name], chart_specs[name])
+        chart_timings[name] = seconds
+        return Image(io.BytesIO(png), width=6*inch, height=3*inch)
+
+    listing_style = TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.whitesmoke, colors.lightgrey]),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('VALIGN', (0,0), (-1,-1), 'TOP')
+    ])
+
+    def flowables():
+
+        # ===============================
+        # EXECUTIVE SUMMARY PAGE
+        # ===============================
+
+        yield Paragraph("<b>SNU Brown Bag Research Analytics Report</b>", styles["Title"])
+        yield Spacer(1, 0.3 * inch)
+
+        summary_data = [
+            ["Total Presentations", total_presentations],
+            ["Departments Engaged", total_departments],
+            ["Unique Presenters", total_presenters],
+            ["Research Intensity Index", intensity_index],
+            ["Year-over-Year Growth %", f"{yoy_growth}%"]
+        ]
 
-    summary_table = Table(summary_data, colWidths=[250, 100])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,-1), colors.whitesmoke),
-        ('ROWBACKGROUNDS', (0,0), (-1,-1), [colors.whitesmoke, colors.lightblue]),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ('TEXTCOLOR', (1,0), (1,-1), colors.darkblue)
-    ]))
+        summary_table = Table(summary_data, colWidths=[250, 100])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0,0), (-1,-1), colors.whitesmoke),
+            ('ROWBACKGROUNDS', (0,0), (-1,-1), [colors.whitesmoke, colors.lightblue]),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+            ('TEXTCOLOR', (1,0), (1,-1), colors.darkblue)
+        ]))
+
+        yield summary_table
+        yield PageBreak()
+
+        # ===============================
+        # MONTHLY TRENDS CHART
+        # ===============================
+
+        yield Paragraph("<b>Monthly Trends Analysis</b>", styles["Heading2"])
+        yield Spacer(1, 0.2 * inch)
+        yield chart_image("Monthly trends")
+        yield PageBreak()
+
+        # ===============================
+        # DEPARTMENT PERFORMANCE
+        # ===============================
+
+        dept_counts["Rank"] = dept_counts["Presentations"].rank(ascending=False).astype(int)
+        dept_counts["Performance Score"] = round(
+            (dept_counts["Presentations"] / dept_counts["Presentations"].max()) * 100, 2
+        )
 
-    elements.append(summary_table)
-    elements.append(PageBreak())
+        yield Paragraph("<b>Department Ranking & Performance Score</b>", styles["Heading2"])
+        yield Spacer(1, 0.2 * inch)
+        yield from _table_chunks(
+            dept_counts.columns.tolist(),
+            dept_counts.itertuples(index=False, name=None),
+            listing_style,
+            col_widths=[200, 90, 60, 110],
+        )
+        yield Spacer(1, 0.3 * inch)
+
+        # Department Distribution Chart
+        yield chart_image("Department distribution")
+        yield PageBreak()
+
+        # ===============================
+        # YEARLY GROWTH VISUAL
+        # ===============================
+
+        if len(yearly_counts) > 1:
+            yield Paragraph("<b>Year-over-Year Growth Analysis</b>", styles["Heading2"])
+            yield Spacer(1, 0.2 * inch)
+            yield chart_image("Yearly growth")
+            yield PageBreak()
+
+        # ===============================
+        # GENERATION TIMING
+        # ===============================
+
+        charts_wall = time.perf_counter() - charts_start
+        timing_data = [["Chart", "Render time (ms)"]]
+        timing_data += [[name, f"{secs * 1000:.0f}"] for name, secs in chart_timings.items()]
+        timing_data.append(["All charts (wall clock)", f"{charts_wall * 1000:.0f}"])
+
+        timing_table = Table(timing_data, colWidths=[250, 100])
+        timing_table.setStyle(TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.grey)
+        ]))
+
+        yield Paragraph("<b>Report Generation Timing</b>", styles["Heading2"])
+        yield Spacer(1, 0.2 * inch)
+        yield timing_table
+
+        # ===============================
+        # APPENDIX: EVERY TALK BY DEPARTMENT
+        # ===============================
+        # Streamed from a cursor straight into table chunks, so memory stays
+        # flat however many presentations there are.
+
+        if include_appendix and pool is not None:
+            yield PageBreak()
+            yield Paragraph("<b>Appendix: Presentations by Department</b>", styles["Heading1"])
+
+            header = ["Date", "Time", "Title", "Presenter", "Designation"]
+            with pool.connection() as conn:
+                cursor = conn.execute(
+                    """
+                    SELECT d.name, p.date, p.time, p.title, p.presenter, p.designation
+                    FROM presentations p
+                    JOIN departments d ON p.dept_id = d.id
+                    ORDER BY d.name, p.start_ts
+                    """
+                )
+                try:
+                    for dept, talks in itertools.groupby(_iter_cursor(cursor), key=lambda r: r[0]):
+                        yield Paragraph(f"<b>{escape(dept)}</b>", styles["Heading2"])
+                        yield from _table_chunks(
+                            header,
+                            (
+                                [date, time_, Paragraph(escape(title or ""), cell_style),
+                                 Paragraph(escape(presenter or ""), cell_style), designation]
+                                for _, date, time_, title, presenter, designation in talks
+                            ),
+                            listing_style,
+                            col_widths=[65, 55, 200, 110, 65],
+                        )
+                finally:
+                    # Ends the read statement before the connection goes back.
+                    cursor.close()
 
     # ===============================
-    # MONTHLY TRENDS CHART
+    # BUILD PDF
     # ===============================
 
-    plt.figure(figsize=(8,4))
-    monthly_counts.plot(kind="bar", color="#1f77b4")
-    plt.title("Monthly Presentation Trends")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("monthly.png")
-    plt.close()
+    # Closing the generator on failure releases the appendix connection now
+    # rather than whenever the generator is garbage collected.
+    stream = flowables()
+    try:
+        doc.build(_FlowableStream(stream))
+    finally:
+        stream.close()
 
-    elements.append(Paragraph("<b>Monthly Trends Analysis</b>", styles["Heading2"]))
-    elements.append(Spacer(1, 0.2 * inch))
-    elements.append(Image("monthly.png", width=6*inch, height=3*inch))
-    elements.append(PageBreak())
+    return pdf_buffer.getvalue()
 
-    # ===============================
-    # DEPARTMENT PERFORMANCE
-    # ===============================
+# 🔹 BACKGROUND REPORT GENERATION
 
-    dept_counts = df.groupby("Dept").size().sort_values(ascending=False)
-    dept_counts = dept_counts.reset_index()
-    dept_counts.columns = ["Department", "Presentations"]
+# Bump when the report layout changes so cached PDFs are not reused.
+REPORT_FORMAT = 3
 
-    dept_counts["Rank"] = dept_counts["Presentations"].rank(ascending=False).astype(int)
-    dept_counts["Performance Score"] = round(
-        (dept_counts["Presentations"] / dept_counts["Presentations"].max()) * 100, 2
-    )
 
-    table_data = [dept_counts.columns.tolist()] + dept_counts.values.tolist()
+def report_key(data_version, include_appendix=False):
+    return hashlib.sha256(
+        f"report:{REPORT_FORMAT}:{data_version}:{int(include_appendix)}".encode()
+    ).hexdigest()[:16]
 
-    dept_table = Table(table_data)
-    dept_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.darkblue),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.whitesmoke, colors.lightgrey]),
-        ('GRID', (0,0), (-1,-1), 0.5, colors.grey)
-    ]))
-
-    elements.append(Paragraph("<b>Department Ranking & Performance Score</b>", styles["Heading2"]))
-    elements.append(Spacer(1, 0.2 * inch))
-    elements.append(dept_table)
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # Department Distribution Chart
-    plt.figure(figsize=(8,4))
-    dept_counts.set_index("Department")["Presentations"].plot(kind="bar", color="#ff7f0e")
-    plt.title("Department Distribution")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig("dept.png")
-    plt.close()
-
-    elements.append(Image("dept.png", width=6*inch, height=3*inch))
-    elements.append(PageBreak())
 
-    # ===============================
-    # YEARLY GROWTH VISUAL
-    # ===============================
+class ReportService:
+    """Builds PDF reports off the script thread and keeps them in
+    ``report_runs``, keyed on the data version they were built from. Only
+    the newest ``keep_pdfs`` PDFs are stored; older runs keep their history
+    row without the file."""
 
-    if len(yearly_counts) > 1:
-        plt.figure(figsize=(8,4))
-        yearly_counts.plot(kind="line", marker='o', color="green")
-        plt.title("Yearly Growth Trend")
-        plt.tight_layout()
-        plt.savefig("yearly.png")
-        plt.close()
+    def __init__(self, pool, max_workers=2, chart_executor=None, keep_pdfs=5):
+        self.pool = pool
+        self.chart_executor = chart_executor
+        self.keep_pdfs = keep_pdfs
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="report"
+        )
+        # Runs cut short by a restart will never finish.
+        pool.execute(
+            """UPDATE report_runs SET status = 'failed', error = 'Interrupted by restart.'
+               WHERE status IN ('pending', 'running')"""
+        )
+
+    def request(self, include_appendix=False):
+        # Returns the id of a run for the current data: an existing finished
+        # or in-flight one if there is one, otherwise a newly queued run.
+        with self._lock:
+            with self.pool.transaction() as conn:
+                key = report_key(get_data_version(conn), include_appendix)
+                row = conn.execute(
+                    """SELECT id FROM report_runs
+                       WHERE data_key = ? AND (status IN ('pending', 'running')
+                                               OR status = 'done' AND pdf IS NOT NULL)
+                       ORDER BY id DESC LIMIT 1""",
+                    (key,),
+                ).fetchone()
+                if row:
+                    return row[0]
+                run_id = conn.execute(
+                    """INSERT INTO report_runs (data_key, appendix, status, requested_at)
+                       VALUES (?, ?, 'pending', ?)""",
+                    (
+                        key,
+                        int(include_appendix),
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    ),
+                ).lastrowid
+        self._executor.submit(self._generate, run_id, include_appendix)
+        return run_id
+
+    def _generate(self, run_id, include_appendix=False):
+        start = time.perf_counter()
+        self.pool.execute(
+            "UPDATE report_runs SET status = 'running' WHERE id = ?", (run_id,)
+        )
+        try:
+            version, rollups = read_rollups(self.pool)
+            pdf_data = generate_pdf_report(
+                rollups, self.chart_executor, self.pool, include_appendix
+            )
+        except Exception as e:
+            logging.getLogger(__name__).exception("Report %s failed", run_id)
+            self.pool.execute(
+                "UPDATE report_runs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (str(e), datetime.now().strftime("%Y-%m-%d %H:%M:%S"), run_id),
+            )
+            return
+        self.pool.execute(
+            """UPDATE report_runs
+               SET status = 'done', data_key = ?, pdf = ?, size_bytes = ?,
+                   duration_ms = ?, finished_at = ?
+               WHERE id = ?""",
+            (
+                report_key(version, include_appendix),
+                pdf_data,
+                len(pdf_data),
+                round((time.perf_counter() - start) * 1000, 1),
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                run_id,
+            ),
+        )
+        self._prune()
+
+    def _prune(self):
+        # Every data change makes the next Generate a new PDF; drop all but
+        # the newest files so the database stops growing with them.
+        self.pool.execute(
+            """UPDATE report_runs SET pdf = NULL
+               WHERE pdf IS NOT NULL AND id NOT IN
+                     (SELECT id FROM report_runs WHERE pdf IS NOT NULL
+                      ORDER BY id DESC LIMIT ?)""",
+            (self.keep_pdfs,),
+        )
+
+    def status(self, run_id):
+        # A finished run whose PDF has since been pruned reads as "expired".
+        return self.pool.fetchone(
+            """SELECT CASE WHEN status = 'done' AND pdf IS NULL
+                           THEN 'expired' ELSE status END, error
+               FROM report_runs WHERE id = ?""",
+            (run_id,),
+        )
 
-        elements.append(Paragraph("<b>Year-over-Year Growth Analysis</b>", styles["Heading2"]))
-        elements.append(Spacer(1, 0.2 * inch))
-        elements.append(Image("yearly.png", width=6*inch, height=3*inch))
+    def pdf(self, run_id):
+        row = self.pool.fetchone("SELECT pdf FROM report_runs WHERE id = ?", (run_id,))
+        return row[0] if row else b""
 
-    # ===============================
-    # BUILD PDF
-    # ===============================
+    def history(self, limit=10):
+        return self.pool.read_sql(
+            """SELECT id, requested_at, finished_at, status, appendix, duration_ms,
+                      size_bytes, data_key, error
+               FROM report_runs ORDER BY id DESC LIMIT ?""",
+            params=(limit,),
+        )
 
-    doc.build(elements)
 
-    for f in ["monthly.png", "dept.png", "yearly.png"]:
-        if os.path.exists(f):
-            os.remove(f)
+@st.cache_resource
+def get_chart_executor():
+    # Chart workers must be forked: "spawn" and "forkserver" children re-run
+    # __main__, which under Streamlit is this whole app script. Forking a
+    # threaded process can deadlock the child on a lock another thread held
+    # (Python 3.12+ warns about it), so the workers are forked once, at
+    # startup, before the broadcast worker or report threads exist, and never
+    # again. Streamlit's own server threads are still running then; that
+    # risk remains. Where fork is unavailable the charts are rendered in the
+    # report thread instead.
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    charts = ProcessPoolExecutor(
+        max_workers=3, mp_context=multiprocessing.get_context("fork")
+    )
+    # A fork pool starts all of its workers on the first submit.
+    charts.submit(os.getpid).result()
+    return charts
 
-    with open(file_path, "rb") as f:
-        pdf_data = f.read()
 
-    os.remove(file_path)
+@st.cache_resource
+def get_report_service():
+    return ReportService(get_pool(), chart_executor=get_chart_executor())
 
-    return pdf_data
 
 # --- 4. APP INTERFACE ---
 
 
 st.set_page_config(page_title="SNU | Brown Bag Portal", layout="wide")
 init_db()
-
-TIME_SLOTS = [
-    dt_time(h, m).strftime("%I:%M %p") for h in range(8, 20) for m in (0, 15, 30, 45)
-]
-DURATIONS = ["30 mins", "45 mins", "1 hour", "1.5 hours", "2 hours"]
+# Forked before any of the app's own threads start; see get_chart_executor.
+get_chart_executor()
+# Started with the app so broadcasts interrupted by a restart resume.
+get_broadcast_worker()
 
 if "auth" not in st.session_state:
-    st.session_state["auth"] = False
-if "dept" not in st.session_state:
-    st.session_state["dept"] = None
+    st.session_state["auth"] = None
+if "section_timings" not in st.session_state:
+    st.session_state["section_timings"] = {}
 st.title("🎓 Shiv Nadar University | Brown Bag Portal")
-tabs = st.tabs(
-    ["📅 Public Schedule", "📊 Analytics", "🔐 Coordinator Access", "🛠️ Admin Control"]
-)
+show_flash()
+
+
+@contextmanager
+def section_timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        st.session_state["section_timings"][name] = round(
+            (time.perf_counter() - start) * 1000, 1
+        )
+
 
-conn = sqlite3.connect("ssn_research.db")
-df = pd.read_sql_query(
-    "SELECT p.*, d.name as Dept FROM presentations p JOIN departments d ON p.dept_id = d.id",
-    conn,
-)
-conn.close()
 # 🔹 Columns used across tabs
 
 
@@ -296,23 +2403,42 @@ display_cols = [
 # --- TAB 1: PUBLIC SCHEDULE ---
 
 
-with tabs[0]:
+def render_public_schedule():
     st.subheader("📅 Public Presentation Schedule")
 
-    conn = sqlite3.connect("ssn_research.db")
     today = datetime.now().strftime("%Y-%m-%d")
 
+    # 🔹 Search
+
+    search_text = st.text_input(
+        "🔍 Search talks",
+        key="search_text",
+        placeholder="Title, abstract, presenter or guide",
+    )
+    if search_text.strip():
+        results = search_presentations(search_text)
+        if results.empty:
+            st.info("No presentations match your search.")
+        for _, r in results.iterrows():
+            st.markdown(
+                f"**{markdown_escape(r['title'])}** — "
+                f"{markdown_escape(r['presenter'])} ({markdown_escape(r['Dept'])}) · "
+                f"{markdown_escape(r['date'])} {markdown_escape(r['time'])}"
+            )
+            if r["snippet"]:
+                st.caption(highlight_markdown(r["snippet"]))
+        st.divider()
+
     # 🔹 Upcoming
 
-    upcoming = pd.read_sql_query(
+    upcoming = get_pool().read_sql(
         """
         SELECT p.*, d.name as Dept
         FROM presentations p
         JOIN departments d ON p.dept_id = d.id
-        WHERE date >= ?
-        ORDER BY date ASC, time ASC
+        WHERE p.start_ts >= ?
+        ORDER BY p.start_ts ASC
     """,
-        conn,
         params=(today,),
     )
 
@@ -321,50 +2447,65 @@ with tabs[0]:
     if upcoming.empty:
         st.info("No upcoming presentations.")
     else:
-       display_cols = [
-        "date",
-        "time",
-        "Dept",
-        "title",
-        "presenter",
-        "designation",
-        "guide_name",
-        "duration",
-        "venue_hall",   # ✅ actual column name
-    ]
+        display_cols = [
+            "date",
+            "time",
+            "Dept",
+            "title",
+            "presenter",
+            "designation",
+            "guide_name",
+            "duration",
+            "venue_hall",  # ✅ actual column name
+        ]
 
-    safe_cols = [col for col in display_cols if col in upcoming.columns]
+        safe_cols = [col for col in display_cols if col in upcoming.columns]
 
-    df_show = upcoming[safe_cols].sort_values(["date", "time"])
+        df_show = upcoming[safe_cols]
 
-    # ✅ Rename only for UI
-    df_show = df_show.rename(columns={
-    "venue_hall": "Venue / Meeting Link"
-    })
+        # ✅ Rename only for UI
+        df_show = df_show.rename(columns={"venue_hall": "Venue / Meeting Link"})
 
-    st.dataframe(
-        df_show,
-        use_container_width=True,
-    )
+        st.dataframe(
+            df_show,
+            use_container_width=True,
+        )
     # 🔹 Previous
 
-    previous = pd.read_sql_query(
-        """
-        SELECT p.*, d.name as Dept
-        FROM presentations p
-        JOIN departments d ON p.dept_id = d.id
-        WHERE date < ?
-        ORDER BY date DESC, time DESC
-    """,
-        conn,
-        params=(today,),
+    st.markdown("## 📜 Previous Presentations")
+
+    dept_ids = dict(
+        get_pool().fetchall("SELECT name, id FROM departments ORDER BY name")
     )
 
-    st.markdown("## 📜 Previous Presentations")
+    fc1, fc2, fc3 = st.columns(3)
+    f_dept = fc1.selectbox("Department", ["All"] + list(dept_ids), key="prev_dept")
+    f_role = fc2.selectbox("Designation", ["All"] + DESIGNATIONS, key="prev_role")
+    f_range = fc3.date_input("Date range", value=[], key="prev_range")
+    date_from, date_to = (list(f_range) + [None, None])[:2]
+
+    where, params = presentation_filter_sql(
+        before=today,
+        dept_id=dept_ids.get(f_dept),
+        designation=None if f_role == "All" else f_role,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
-    if previous.empty:
+    # Cursor stack: entry i is the keyset position page i starts after.
+    pager = st.session_state.get("prev_pager")
+    if pager is None or pager["filter"] != (where, params):
+        pager = {"filter": (where, params), "cursors": [None]}
+        st.session_state["prev_pager"] = pager
+    cursors = pager["cursors"]
+
+    total = count_presentations(where, params)
+
+    if total == 0:
         st.info("No previous presentations.")
     else:
+        previous = fetch_presentations_page(where, params, after=cursors[-1])
+
         display_cols = [
             "date",
             "time",
@@ -377,303 +2518,478 @@ with tabs[0]:
             "venue_hall",
         ]
 
-        safe_cols = [col for col in display_cols if col in previous.columns]
-
         st.dataframe(
-            previous[safe_cols].sort_values(["date", "time"], ascending=False),
+            previous[display_cols].rename(
+                columns={"venue_hall": "Venue / Meeting Link"}
+            ),
             use_container_width=True,
+            hide_index=True,
         )
-    conn.close()
+
+        pages = -(-total // PAGE_SIZE)
+        pc1, pc2, pc3 = st.columns([1, 3, 1])
+        if pc1.button("◀ Newer", disabled=len(cursors) == 1, key="prev_newer"):
+            cursors.pop()
+            st.rerun()
+        pc2.caption(f"Page {len(cursors)} of {pages} · {total} presentations")
+        if pc3.button("Older ▶", disabled=len(cursors) >= pages, key="prev_older"):
+            last = previous.iloc[-1]
+            cursors.append((last["start_ts"], int(last["id"])))
+            st.rerun()
+
+
 # --- TAB 2: ANALYTICS ---
 
 
-with tabs[1]:
-    if not df.empty:
+def render_analytics():
+    dept_ids = dict(
+        get_pool().fetchall("SELECT name, id FROM departments ORDER BY name")
+    )
+
+    fc1, fc2 = st.columns(2)
+    f_dept = fc1.selectbox("Department", ["All"] + list(dept_ids), key="an_dept")
+    f_range = fc2.date_input("Date range", value=[], key="an_range")
+    date_from, date_to = (list(f_range) + [None, None])[:2]
+
+    result = get_analytics_figures(
+        current_data_version(), dept_ids.get(f_dept), date_from, date_to
+    )
+    if result is not None:
+        (f1, f2, f3, f4, f5), guides = result
         st.subheader("Presentation Statistics")
-        f1, f2 = get_plots(df)
         col1, col2 = st.columns(2)
         with col1:
             st.plotly_chart(f1, use_container_width=True)
         with col2:
             st.plotly_chart(f2, use_container_width=True)
+        st.plotly_chart(f3, use_container_width=True)
+        col3, col4 = st.columns(2)
+        with col3:
+            st.plotly_chart(f4, use_container_width=True)
+        with col4:
+            st.plotly_chart(f5, use_container_width=True)
+
+        st.subheader("🏅 Guide / Supervisor Leaderboard")
+        st.dataframe(guides, use_container_width=True, hide_index=True)
     else:
         st.warning("No data available for analytics yet.")
 # --- TAB 3: COORDINATOR ---
 
 
-with tabs[2]:
+def show_conflicts(venue, clashes, free):
+    st.error(
+        f"⛔ {venue} is already booked: "
+        + "; ".join(
+            f"{title} ({presenter}, {s:%I:%M %p}–{e:%I:%M %p})"
+            for _, title, presenter, s, e in clashes
+        )
+    )
+    if free:
+        st.info("Nearest free start times there that day: " + ", ".join(free))
+    else:
+        st.info("No free slot left at this venue that day.")
+
+
+ADD_FORM_KEYS = [
+    "add_name",
+    "add_role",
+    "add_guide",
+    "add_title",
+    "add_date",
+    "add_time",
+    "add_dur",
+    "add_venue",
+    "add_abstract",
+]
 
-    if not st.session_state["auth"]:
 
-        # --- LOGIN INTERFACE ---
+# Coordinator writes go through get_dataset().writing(), which patches the
+# cached presentations in place, and then rerun only their own fragment.
 
-        conn = sqlite3.connect("ssn_research.db")
-        d_df = pd.read_sql_query("SELECT * FROM departments", conn)
-        conn.close()
 
-        dept_choice = st.selectbox(
-            "Select Dept", d_df["name"].tolist() if not d_df.empty else ["No Depts"]
-        )
+@st.fragment
+def render_add_presentation():
+    auth = get_auth("auth")
+    if auth is None:
+        st.rerun()
+    show_flash()
+    st.subheader("➕ Schedule New Presentation")
 
-        pass_in = st.text_input("Password", type="password")
+    # Not cleared on submit, so a venue clash keeps what was typed;
+    # a successful add clears the fields via ADD_FORM_KEYS instead.
+    with st.form("add_pres_form"):
 
-        if st.button("Login"):
-            if (
-                not d_df.empty
-                and pass_in == d_df[d_df["name"] == dept_choice]["password"].values[0]
-            ):
-                st.session_state["auth"] = True
-                st.session_state["dept"] = dept_choice
-                st.rerun()
+        col1, col2 = st.columns(2)
+
+        with col1:
+            p_name = st.text_input("Presenter Name", key="add_name")
+            p_role = st.selectbox("Designation", DESIGNATIONS, key="add_role")
+            p_guide = st.text_input("Guide/Supervisor Name", key="add_guide")
+            p_title = st.text_input("Presentation Title", key="add_title")
+        with col2:
+            p_date = st.date_input("Date", min_value=datetime.now(), key="add_date")
+            p_time = st.selectbox("Start Time", TIME_SLOTS, key="add_time")
+            p_dur = st.selectbox("Duration", DURATIONS, key="add_dur")
+            p_venue = st.text_input("Venue/Hall/Meeting Link", key="add_venue")
+        p_abstract = st.text_area("Abstract/Description", key="add_abstract")
+
+        submit_btn = st.form_submit_button("Confirm & Schedule")
+
+        if submit_btn:
+
+            if not p_name or not p_title:
+                st.error("Please fill in Name and Title.")
             else:
-                st.error("Invalid Credentials.")
-    else:
-        # --- LOGGED IN DASHBOARD ---
+                start, end = slot_bounds(p_date, p_time, p_dur)
+                # Checked and inserted under one write lock, so two
+                # coordinators cannot both take the same slot.
+                with get_dataset().writing() as (conn, change):
+
+                    clashes = find_conflicts(conn, p_venue, start, end)
+                    if clashes:
+                        free = suggest_free_slots(
+                            conn, p_venue, p_date, p_time, p_dur, TIME_SLOTS
+                        )
+                    else:
 
-        st.subheader(f"Coordinator: {st.session_state['dept']}")
+                        cur = conn.execute(
+                            """
+                            INSERT INTO presentations 
+                            (presenter, designation, guide_name, title, abstract, date, time, duration, venue_hall, dept_id)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                            (
+                                p_name,
+                                p_role,
+                                p_guide,
+                                p_title,
+                                p_abstract,
+                                str(p_date),
+                                p_time,
+                                p_dur,
+                                p_venue,
+                                auth.dept_id,
+                            ),
+                        )
+                        change["upserted"].append(cur.lastrowid)
 
-        if st.button("Logout"):
-            st.session_state["auth"] = False
-            st.rerun()
-        c_mode = st.radio("Mode", ["Add New", "Manage Presentations"], horizontal=True)
-        st.divider()
+                        # LOG ACTIVITY
 
-        # --- SUB-SECTION: ADD NEW ---
+                        conn.execute(
+                            """
+                            INSERT INTO activity_logs
+                            (action, title, presenter, dept_name, done_by, action_time)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        """,
+                            (
+                                "ADDED",
+                                p_title,
+                                p_name,
+                                auth.dept_name,
+                                auth.dept_name,
+                                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            ),
+                        )
 
-        if c_mode == "Add New":
-            st.subheader("➕ Schedule New Presentation")
+                if clashes:
+                    show_conflicts(p_venue, clashes, free)
+                else:
+                    for key in ADD_FORM_KEYS:
+                        st.session_state.pop(key, None)
+                    flash_refresh("Presentation Added!", scope="fragment")
 
-            with st.form("add_pres_form", clear_on_submit=True):
 
-                col1, col2 = st.columns(2)
+@st.fragment
+def render_manage_presentations():
+    auth = get_auth("auth")
+    if auth is None:
+        st.rerun()
+    show_flash()
 
-                with col1:
-                    p_name = st.text_input("Presenter Name")
-                    p_role = st.selectbox(
-                        "Designation", ["Faculty", "Scholar", "Student"]
-                    )
-                    p_guide = st.text_input("Guide/Supervisor Name")
-                    p_title = st.text_input("Presentation Title")
-                with col2:
-                    p_date = st.date_input("Date", min_value=datetime.now())
-                    p_time = st.selectbox("Start Time", TIME_SLOTS)
-                    p_dur = st.selectbox("Duration", DURATIONS)
-                    p_venue = st.text_input("Venue/Hall/Meeting Link")
-                p_abstract = st.text_area("Abstract/Description")
+    # Served from the cached dataset, which this fragment's own writes
+    # keep current without a reload.
+    df = get_dataset().get()
+    pres_df = df[df["dept_id"] == auth.dept_id].sort_values(["start_ts", "id"])
 
-                submit_btn = st.form_submit_button("Confirm & Schedule")
+    if pres_df.empty:
+        st.info("No presentations found.")
+        return
 
-                if submit_btn:
+    st.subheader("📋 Department Presentations")
 
-                    if not p_name or not p_title:
-                        st.error("Please fill in Name and Title.")
-                    else:
-                        conn = sqlite3.connect("ssn_research.db")
+    display_cols = [
+        "id",
+        "date",
+        "time",
+        "title",
+        "presenter",
+        "designation",
+        "guide_name",
+        "duration",
+        "venue_hall",
+    ]
 
-                        dept_res = conn.execute(
-                            "SELECT id FROM departments WHERE name=?",
-                            (st.session_state["dept"],),
-                        ).fetchone()
+    st.dataframe(
+        pres_df[display_cols],
+        use_container_width=True,
+        hide_index=True,
+    )
 
-                        if dept_res:
+    st.divider()
 
-                            conn.execute(
-                                """
-                                INSERT INTO presentations 
-                                (presenter, designation, guide_name, title, abstract, date, time, duration, venue_hall, dept_id)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                                (
-                                    p_name,
-                                    p_role,
-                                    p_guide,
-                                    p_title,
-                                    p_abstract,
-                                    str(p_date),
-                                    p_time,
-                                    p_dur,
-                                    p_venue,
-                                    dept_res[0],
-                                ),
-                            )
+    # 🔽 SELECT ROW FOR ACTION
 
-                            # LOG ACTIVITY
+    selected_id = st.selectbox("Select Presentation ID to Edit/Delete", pres_df["id"])
 
-                            conn.execute(
-                                """
-                                INSERT INTO activity_logs
-                                (action, title, presenter, dept_name, done_by, action_time)
-                                VALUES (?, ?, ?, ?, ?, ?)
-                            """,
-                                (
-                                    "ADDED",
-                                    p_title,
-                                    p_name,
-                                    st.session_state["dept"],
-                                    st.session_state["dept"],
-                                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                ),
-                            )
+    col1, col2 = st.columns(2)
 
-                            conn.commit()
-                            conn.close()
+    # EDIT
 
-                            delayed_refresh("Presentation Added!")
-                # --- SUB-SECTION: MANAGE ---
-        elif c_mode == "Manage Presentations":
+    if col1.button("✏️ Edit Selected"):
+        st.session_state["edit_id"] = int(selected_id)
+        # DELETE
+    if col2.button("🗑 Delete Selected"):
 
-            conn = sqlite3.connect("ssn_research.db")
-            dept_name = st.session_state["dept"]
+        row = pres_df[pres_df["id"] == selected_id].iloc[0]
 
-            pres_df = pd.read_sql_query(
+        with get_dataset().writing() as (conn, change):
+            conn.execute(
                 """
-                SELECT p.*, d.name as Dept 
-                FROM presentations p 
-                JOIN departments d ON p.dept_id = d.id 
-                WHERE d.name = ?
+                INSERT INTO activity_logs
+                (action, title, presenter, dept_name, done_by, action_time)
+                VALUES (?, ?, ?, ?, ?, ?)
                 """,
-                conn,
-                params=(dept_name,),
+                (
+                    "DELETED",
+                    row["title"],
+                    row["presenter"],
+                    row["Dept"],
+                    auth.dept_name,
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                ),
             )
-            conn.close()
 
-            if pres_df.empty:
-                st.info("No presentations found.")
-            else:
-                st.subheader("📋 Department Presentations")
-
-                display_cols = [
-                    "id",
-                    "date",
-                    "time",
-                    "title",
-                    "presenter",
-                    "designation",
-                    "guide_name",
-                    "duration",
-                    "venue_hall",
-                ]
+            conn.execute(
+                "DELETE FROM presentations WHERE id=? AND dept_id=?",
+                (int(selected_id), auth.dept_id),
+            )
+            change["deleted"].append(int(selected_id))
 
-                st.dataframe(
-                    pres_df[display_cols].sort_values(["date", "time"]),
-                    use_container_width=True,
-                )
+        if st.session_state.get("edit_id") == int(selected_id):
+            del st.session_state["edit_id"]
+        flash_refresh("Deleted & Logged", scope="fragment")
+
+    # --- EDIT FORM ---
+
+    if "edit_id" in st.session_state:
 
-                st.divider()
+        edit_id = st.session_state["edit_id"]
 
-                # 🔽 SELECT ROW FOR ACTION
+        edit_data = pres_df[pres_df["id"] == edit_id]
 
-                selected_id = st.selectbox(
-                    "Select Presentation ID to Edit/Delete", pres_df["id"]
+        if not edit_data.empty:
+
+            erow = edit_data.iloc[0]
+
+            st.divider()
+            st.subheader("✏️ Edit Presentation")
+
+            with st.form("edit_form"):
+
+                new_title = st.text_input("Title", erow["title"])
+                new_venue = st.text_input("Venue", erow["venue_hall"])
+                new_time = st.selectbox(
+                    "Time", TIME_SLOTS, index=TIME_SLOTS.index(erow["time"])
+                )
+                new_duration = st.selectbox(
+                    "Duration", DURATIONS, index=DURATIONS.index(erow["duration"])
                 )
 
-                col1, col2 = st.columns(2)
+                update_btn = st.form_submit_button("Update Presentation")
 
-                # EDIT
+                if update_btn:
 
-                if col1.button("✏️ Edit Selected"):
-                    st.session_state["edit_id"] = selected_id
-                    # DELETE
-                if col2.button("🗑 Delete Selected"):
+                    start, end = slot_bounds(erow["date"], new_time, new_duration)
+                    with get_dataset().writing() as (conn, change):
+                        clashes = find_conflicts(
+                            conn, new_venue, start, end, exclude_id=edit_id
+                        )
+                        if clashes:
+                            free = suggest_free_slots(
+                                conn,
+                                new_venue,
+                                erow["date"],
+                                new_time,
+                                new_duration,
+                                TIME_SLOTS,
+                                exclude_id=edit_id,
+                            )
+                        else:
+                            conn.execute(
+                                """
+                                UPDATE presentations
+                                SET title=?, venue_hall=?, time=?, duration=?
+                                WHERE id=? AND dept_id=?
+                            """,
+                                (
+                                    new_title,
+                                    new_venue,
+                                    new_time,
+                                    new_duration,
+                                    int(edit_id),
+                                    auth.dept_id,
+                                ),
+                            )
+                            change["upserted"].append(edit_id)
 
-                    conn = sqlite3.connect("ssn_research.db")
+                    if clashes:
+                        show_conflicts(new_venue, clashes, free)
+                    else:
+                        del st.session_state["edit_id"]
 
-                    row = pres_df[pres_df["id"] == selected_id].iloc[0]
+                        flash_refresh("Presentation Updated!", scope="fragment")
 
-                    conn.execute(
-                        """
-                        INSERT INTO activity_logs
-                        (action, title, presenter, dept_name, done_by, action_time)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            "DELETED",
-                            row["title"],
-                            row["presenter"],
-                            row["Dept"],
-                            st.session_state["dept"],
-                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        ),
-                    )
 
-                    conn.execute("DELETE FROM presentations WHERE id=?", (selected_id,))
-                    conn.commit()
-                    conn.close()
+# --- LOGIN INTERFACE ---
+# A form inside a fragment: only pressing Login reruns anything, and a
+# failed attempt reruns just this fragment.
 
-                    delayed_refresh("Deleted & Logged")
-        # --- EDIT FORM LOGIC (OUTSIDE LOOP) ---
-if "edit_id" in st.session_state:
 
-    edit_id = st.session_state["edit_id"]
+@st.fragment
+def render_login():
+    names = [
+        n for (n,) in get_pool().fetchall("SELECT name FROM departments ORDER BY name")
+    ]
 
-    conn = sqlite3.connect("ssn_research.db")
-    edit_data = pd.read_sql_query(
-        "SELECT * FROM presentations WHERE id=?", conn, params=(edit_id,)
-    )
-    conn.close()
+    with st.form("login_form"):
+        dept_choice = st.selectbox("Select Dept", names or ["No Depts"])
+        pass_in = st.text_input("Password", type="password")
+        submitted = st.form_submit_button("Login")
 
-    if not edit_data.empty:
+    if submitted:
+        dept_id, error = department_login(dept_choice, pass_in)
+        if dept_id is not None:
+            st.session_state["auth"] = AuthSession("coordinator", dept_id, dept_choice)
+            st.rerun()
+        else:
+            st.error(error)
 
-        erow = edit_data.iloc[0]
 
-        st.divider()
-        st.subheader("✏️ Edit Presentation")
+def render_coordinator():
 
-        with st.form("edit_form"):
+    auth = get_auth("auth")
+    if auth is None:
+        render_login()
+    else:
+        # --- LOGGED IN DASHBOARD ---
 
-            new_title = st.text_input("Title", erow["title"])
-            new_venue = st.text_input("Venue", erow["venue_hall"])
-            new_time = st.selectbox(
-                "Time", TIME_SLOTS, index=TIME_SLOTS.index(erow["time"])
-            )
-            new_duration = st.selectbox(
-                "Duration", DURATIONS, index=DURATIONS.index(erow["duration"])
-            )
+        st.subheader(f"Coordinator: {auth.dept_name}")
 
-            update_btn = st.form_submit_button("Update Presentation")
+        if st.button("Logout"):
+            st.session_state["auth"] = None
+            st.rerun()
+        c_mode = st.radio(
+            "Mode", ["Add New", "Bulk Import", "Manage Presentations"], horizontal=True
+        )
+        st.divider()
 
-            if update_btn:
+        # --- SUB-SECTION: ADD NEW ---
 
-                conn = sqlite3.connect("ssn_research.db")
+        if c_mode == "Add New":
+            render_add_presentation()
+                # --- SUB-SECTION: BULK IMPORT ---
+        elif c_mode == "Bulk Import":
+            st.subheader("📥 Import a Schedule")
+            st.caption(
+                "CSV or Excel (.xlsx) with a header row: "
+                + ", ".join(IMPORT_COLUMNS)
+                + ". Times must be Start Time slots such as 02:30 PM; durations one of "
+                + ", ".join(DURATIONS)
+                + "."
+            )
+            st.download_button(
+                "Download CSV template",
+                ",".join(IMPORT_COLUMNS) + "\n",
+                "presentations_template.csv",
+                "text/csv",
+            )
 
-                conn.execute(
-                    """
-                    UPDATE presentations
-                    SET title=?, venue_hall=?, time=?, duration=?
-                    WHERE id=?
-                """,
-                    (new_title, new_venue, new_time, new_duration, edit_id),
-                )
+            upload = st.file_uploader(
+                "Schedule file", type=["csv", "xlsx"], key="import_file"
+            )
 
-                conn.commit()
-                conn.close()
+            if upload is not None and st.button("Import"):
+                start = time.perf_counter()
+                try:
+                    added, problems = import_presentations(
+                        upload.name,
+                        upload,
+                        auth.dept_id,
+                        auth.dept_name,
+                        auth.dept_name,
+                    )
+                except (ValueError, csv.Error, zipfile.BadZipFile) as e:
+                    st.error(f"Could not read {upload.name}: {e}")
+                else:
+                    st.success(
+                        f"Imported {added} presentation(s) in "
+                        f"{(time.perf_counter() - start) * 1000:.0f} ms."
+                    )
+                    if problems:
+                        st.warning(f"{len(problems)} row(s) skipped:")
+                        st.dataframe(
+                            pd.DataFrame(problems, columns=["Row", "Problem"]),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+                # --- SUB-SECTION: MANAGE ---
+        elif c_mode == "Manage Presentations":
+            render_manage_presentations()
 
-                del st.session_state["edit_id"]
 
-                delayed_refresh("Presentation Updated!")
 # --- TAB 4: ADMIN CONTROL ---
 
 
-with tabs[3]:
-    admin_pass = st.text_input("Admin Pass", type="password", key="admin_pwd_input")
-    if admin_pass == "admin123":
+def render_admin():
+    if get_auth("admin_auth") is None:
+        with st.form("admin_login"):
+            admin_pass = st.text_input(
+                "Admin Pass", type="password", key="admin_pwd_input"
+            )
+            submitted = st.form_submit_button("Unlock")
+        if submitted:
+            ok, error = admin_login(admin_pass)
+            if ok:
+                st.session_state["admin_auth"] = AuthSession("admin")
+                st.rerun()
+            st.error(error)
+    else:
+        if st.button("🔒 Lock Admin"):
+            st.session_state["admin_auth"] = None
+            st.rerun()
         adm = st.radio(
             "Tool",
-            ["Departments", "Subscribers", "Broadcast", "Reports", "Notifications"],
+            [
+                "Departments",
+                "Subscribers",
+                "Broadcast",
+                "Reports",
+                "Notifications",
+                "Exports",
+            ],
             horizontal=True,
         )
 
         if adm == "Reports":
-            if not df.empty:
+            if get_pool().fetchone("SELECT 1 FROM rollup_dept LIMIT 1"):
                 st.subheader("Generate Institutional Report")
+                reports = get_report_service()
+                appendix = st.checkbox("Include per-department appendix of every talk")
                 if st.button("Generate PDF"):
-                    with st.spinner("⏳ Preparing PDF with charts..."):
-                        pdf_data = generate_pdf_report(df)
-                        st.download_button(
-                            "📘 Download PDF Report",
-                            pdf_data,
-                            "SNU_Research_Report.pdf",
-                        )
+                    st.session_state["report_run"] = reports.request(appendix)
+                busy = reports.history()["status"].isin(["pending", "running"]).any()
+                # Poll only while a report is being built.
+                st.fragment(render_report_status, run_every=2 if busy else None)(busy)
             else:
                 st.error("Cannot generate report: No data found.")
         elif adm == "Subscribers":
@@ -681,31 +2997,25 @@ with tabs[3]:
                 new_sub = st.text_input("Add Subscriber Email")
                 if st.form_submit_button("Add"):
                     with st.spinner("⏳ Saving..."):
-                        conn = sqlite3.connect("ssn_research.db")
                         try:
-                            conn.execute(
+                            get_pool().execute(
                                 "INSERT INTO subscriptions (email) VALUES (?)",
                                 (new_sub,),
                             )
-                            conn.commit()
-                            delayed_refresh("Subscriber Added.")
-                        except:
+                        except sqlite3.IntegrityError:
                             st.error("Already subscribed.")
-                        finally:
-                            conn.close()
+                        else:
+                            flash_refresh("Subscriber Added.")
             st.divider()
-            conn = sqlite3.connect("ssn_research.db")
-            subs = pd.read_sql_query("SELECT * FROM subscriptions", conn)
-            conn.close()
+            subs = get_pool().read_sql("SELECT * FROM subscriptions")
             for _, s in subs.iterrows():
                 sc1, sc2 = st.columns([4, 1])
                 sc1.text(s["email"])
                 if sc2.button("Remove", key=f"rs_{s['id']}"):
-                    conn = sqlite3.connect("ssn_research.db")
-                    conn.execute("DELETE FROM subscriptions WHERE id=?", (s["id"],))
-                    conn.commit()
-                    conn.close()
-                    delayed_refresh("Removed.")
+                    get_pool().execute(
+                        "DELETE FROM subscriptions WHERE id=?", (int(s["id"]),)
+                    )
+                    flash_refresh("Removed.")
         elif adm == "Departments":
             with st.expander("➕ Register Department"):
                 with st.form("new_d"):
@@ -714,33 +3024,75 @@ with tabs[3]:
                     dc = st.text_input("Coord Email")
                     dp = st.text_input("Pass", type="password")
                     if st.form_submit_button("Create"):
-                        conn = sqlite3.connect("ssn_research.db")
-                        conn.execute(
-                            "INSERT INTO departments (name,head_email,coord_email,password) VALUES (?,?,?,?)",
-                            (dn, dh, dc, dp),
+                        get_pool().execute(
+                            "INSERT INTO departments (name,head_email,coord_email,password_hash) VALUES (?,?,?,?)",
+                            (dn, dh, dc, hash_password(dp)),
                         )
-                        conn.commit()
-                        conn.close()
-                        delayed_refresh("Created.")
-            conn = sqlite3.connect("ssn_research.db")
-            depts = pd.read_sql_query("SELECT * FROM departments", conn)
-            conn.close()
+                        flash_refresh("Created.")
+            with st.expander("🔑 Change Admin Password"):
+                with st.form("admin_pw"):
+                    np1 = st.text_input("New Password", type="password")
+                    np2 = st.text_input("Repeat", type="password")
+                    if st.form_submit_button("Change"):
+                        if not np1 or np1 != np2:
+                            st.error("Passwords are empty or do not match.")
+                        else:
+                            set_admin_password(np1)
+                            # Sign out; the new password is needed from here on.
+                            st.session_state["admin_auth"] = None
+                            flash_refresh("Admin password changed.")
+            depts = get_pool().read_sql(
+                "SELECT id, name, head_email, coord_email FROM departments"
+            )
+            limiter = get_login_limiter()
             for _, r in depts.iterrows():
                 with st.expander(f"Edit {r['name']}"):
                     with st.form(f"ed_{r['id']}"):
                         en = st.text_input("Dept Name", r["name"])
                         eh = st.text_input("HOD Email", r["head_email"])
                         ec = st.text_input("Coord Email", r["coord_email"])
-                        ep = st.text_input("Password", r["password"])
-                        if st.form_submit_button("Update"):
-                            conn = sqlite3.connect("ssn_research.db")
-                            conn.execute(
-                                "UPDATE departments SET name=?, head_email=?, coord_email=?, password=? WHERE id=?",
-                                (en, eh, ec, ep, r["id"]),
+                        ep = st.text_input(
+                            "New Password (leave blank to keep)",
+                            type="password",
+                            key=f"ep_{r['id']}",
+                        )
+                        account = f"dept:{r['id']}"
+                        max_fail, lock_s, locked_until = limiter.policy(account)
+                        lc1, lc2 = st.columns(2)
+                        e_fail = lc1.number_input(
+                            "Lock after failed logins",
+                            1,
+                            100,
+                            int(max_fail),
+                            key=f"lf_{r['id']}",
+                        )
+                        e_lock = lc2.number_input(
+                            "Lockout (minutes)",
+                            1,
+                            1440,
+                            max(1, int(lock_s) // 60),
+                            key=f"lm_{r['id']}",
+                        )
+                        e_unlock = False
+                        if locked_until > time.time():
+                            until = datetime.fromtimestamp(locked_until)
+                            e_unlock = st.checkbox(
+                                f"🔒 Locked until {until:%H:%M} — unlock",
+                                key=f"lu_{r['id']}",
                             )
-                            conn.commit()
-                            conn.close()
-                            delayed_refresh("Updated.")
+                        if st.form_submit_button("Update"):
+                            with get_pool().transaction() as conn:
+                                conn.execute(
+                                    "UPDATE departments SET name=?, head_email=?, coord_email=? WHERE id=?",
+                                    (en, eh, ec, int(r["id"])),
+                                )
+                                if ep:
+                                    conn.execute(
+                                        "UPDATE departments SET password_hash=? WHERE id=?",
+                                        (hash_password(ep), int(r["id"])),
+                                    )
+                            limiter.set_policy(account, e_fail, e_lock * 60, e_unlock)
+                            flash_refresh("Updated.")
         elif adm == "Broadcast":
             st.subheader("📢 Email Notifications")
             aud = st.selectbox("Target", ["Coordinators Only", "Include Subscribers"])
@@ -748,38 +3100,33 @@ with tabs[3]:
             spa = st.text_input("App Password", type="password")
 
             if st.button("🚀 Send Emails"):
-                with st.spinner("⏳ Broadcasting..."):
-                    conn = sqlite3.connect("ssn_research.db")
+                if not sem or not spa:
+                    st.error("Mail credentials missing.")
+                else:
+                    pool = get_pool()
                     list_re = (
-                        pd.read_sql_query(
-                            "SELECT head_email, coord_email FROM departments", conn
-                        )
+                        pool.read_sql("SELECT head_email, coord_email FROM departments")
                         .values.flatten()
                         .tolist()
                     )
                     if "Include" in aud:
-                        list_re += pd.read_sql_query(
-                            "SELECT email FROM subscriptions", conn
-                        )["email"].tolist()
-                    conn.close()
+                        list_re += pool.read_sql("SELECT email FROM subscriptions")[
+                            "email"
+                        ].tolist()
 
                     today = datetime.now().strftime("%Y-%m-%d")
 
-                    conn = sqlite3.connect("ssn_research.db")
-
-                    upcoming_mail = pd.read_sql_query(
+                    upcoming_mail = pool.read_sql(
                         """
                         SELECT p.date, p.time, p.title, p.presenter, p.venue_hall, d.name as Dept
                         FROM presentations p
                         JOIN departments d ON p.dept_id = d.id
-                        WHERE date >= ?
-                        ORDER BY date ASC, time ASC
+                        WHERE p.start_ts >= ?
+                        ORDER BY p.start_ts ASC
                         """,
-                        conn,
                         params=(today,),
                     )
 
-                    conn.close()
                     portal_link = "https://snu-brown-bag-9mdc54huvzfcgenuooan65.streamlit.app/"
 
                     if upcoming_mail.empty:
@@ -805,38 +3152,244 @@ with tabs[3]:
         -------------------------------------------
         """
                         body += f"\nView Full Schedule Here:\n{portal_link}"
-                    res = send_mail("Research Schedule Update", body, list_re, sem, spa)
-                    if res == True:
-                        st.success("Broadcast successful!")
-                    else:
-                        st.error(res)
+                    job_id = get_broadcast_worker().enqueue(
+                        "Research Schedule Update", body, list_re, sem, spa
+                    )
+                    st.success(f"📨 Broadcast #{job_id} queued.")
+
+            jobs = broadcast_progress()
+            active = jobs["status"].isin(["pending", "running"]).any()
+            # Poll only while something is still sending.
+            st.fragment(render_broadcast_jobs, run_every=2 if active else None)(active)
         elif adm == "Notifications":
 
             st.subheader("🔔 Coordinator Activity Notifications")
-            conn = sqlite3.connect("ssn_research.db")
+            archive_activity_logs_daily()
 
-            conn = sqlite3.connect("ssn_research.db")
-            log_df = pd.read_sql_query(
-                """
-                SELECT action_time, action, title, presenter, dept_name, done_by
-                FROM activity_logs
-                ORDER BY id DESC""",
-                conn,
+            dept_names = [
+                n
+                for (n,) in get_pool().fetchall(
+                    "SELECT name FROM departments ORDER BY name"
+                )
+            ]
+            nc1, nc2, nc3 = st.columns(3)
+            n_action = nc1.selectbox("Action", ["All"] + LOG_ACTIONS, key="log_action")
+            n_dept = nc2.selectbox("Department", ["All"] + dept_names, key="log_dept")
+            n_range = nc3.date_input("Date range", value=[], key="log_range")
+            date_from, date_to = (list(n_range) + [None, None])[:2]
+
+            where, params = activity_filter_sql(
+                action=None if n_action == "All" else n_action,
+                dept_name=None if n_dept == "All" else n_dept,
+                date_from=date_from,
+                date_to=date_to,
             )
-            conn.close()
+
+            # Cursor stack, as for Previous Presentations.
+            pager = st.session_state.get("log_pager")
+            if pager is None or pager["filter"] != (where, params):
+                pager = {"filter": (where, params), "cursors": [None]}
+                st.session_state["log_pager"] = pager
+            cursors = pager["cursors"]
+
+            log_df = fetch_activity_page(where, params, after=cursors[-1])
+            has_older = len(log_df) > PAGE_SIZE
+            log_df = log_df.head(PAGE_SIZE)
 
             if not log_df.empty:
-                st.dataframe(log_df, use_container_width=True)
+                st.dataframe(
+                    log_df.drop(columns="id"),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                lc1, lc2, lc3 = st.columns([1, 3, 1])
+                if lc1.button("◀ Newer", disabled=len(cursors) == 1, key="log_newer"):
+                    cursors.pop()
+                    st.rerun()
+                lc2.caption(f"Page {len(cursors)}")
+                if lc3.button("Older ▶", disabled=not has_older, key="log_older"):
+                    last = log_df.iloc[-1]
+                    cursors.append((last["action_time"], int(last["id"])))
+                    st.rerun()
             else:
                 st.info("No activity yet.")
 
+            with st.expander("📦 Retention & Monthly Archive"):
+                with st.form("log_retention"):
+                    days = st.number_input(
+                        "Keep detailed entries for (days)",
+                        1,
+                        3650,
+                        int(get_meta("log_retention_days")),
+                    )
+                    if st.form_submit_button("Save & Archive Now"):
+                        get_pool().execute(
+                            "UPDATE meta SET value = ? WHERE key = 'log_retention_days'",
+                            (int(days),),
+                        )
+                        archived = archive_activity_logs(days)
+                        flash_refresh(f"Archived {archived} log entries.")
+                months = get_pool().read_sql(
+                    """
+                    SELECT month, action, dept_name, n
+                    FROM activity_log_months
+                    ORDER BY month DESC, action, dept_name
+                    """
+                )
+                if months.empty:
+                    st.caption("Nothing archived yet.")
+                else:
+                    st.dataframe(
+                        months.pivot_table(
+                            index=["month", "dept_name"],
+                            columns="action",
+                            values="n",
+                            aggfunc="sum",
+                            fill_value=0,
+                        ),
+                        use_container_width=True,
+                    )
+        elif adm == "Exports":
+            st.subheader("📤 Export Data")
+            st.caption("Files are generated when you click a button.")
 
+            fmt = st.radio("Format", ["Excel (.xlsx)", "CSV"], horizontal=True)
+            ext, mime = (
+                ("xlsx", XLSX_MIME) if fmt.startswith("Excel") else ("csv", "text/csv")
+            )
+            stamp = datetime.now().strftime("%Y%m%d")
+            pool = get_pool()
 
+            st.markdown("#### Presentations")
+            dept_ids = dict(
+                pool.fetchall("SELECT name, id FROM departments ORDER BY name")
+            )
+            ec1, ec2 = st.columns(2)
+            e_dept = ec1.selectbox(
+                "Department", ["All"] + list(dept_ids), key="export_dept"
+            )
+            e_range = ec2.date_input("Date range", value=[], key="export_range")
+            date_from, date_to = (list(e_range) + [None, None])[:2]
+            where, params = presentation_filter_sql(
+                dept_id=dept_ids.get(e_dept), date_from=date_from, date_to=date_to
+            )
+            st.download_button(
+                "⬇️ Presentations",
+                lambda: export_table(pool, "presentations", ext, where, params),
+                f"presentations_{stamp}.{ext}",
+                mime,
+                on_click="ignore",
+            )
 
+            st.markdown("#### Subscribers & Activity")
+            xc1, xc2 = st.columns(2)
+            xc1.download_button(
+                "⬇️ Subscribers",
+                lambda: export_table(pool, "subscribers", ext),
+                f"subscribers_{stamp}.{ext}",
+                mime,
+                on_click="ignore",
+            )
+            xc2.download_button(
+                "⬇️ Activity Log",
+                lambda: export_table(pool, "activity_logs", ext),
+                f"activity_logs_{stamp}.{ext}",
+                mime,
+                on_click="ignore",
+            )
 
+def render_broadcast_jobs(polling=False):
+    jobs = broadcast_progress()
+    # run_every is only set on a full run, so once sending stops, do one
+    # to drop the timer.
+    if polling and not jobs["status"].isin(["pending", "running"]).any():
+        st.rerun()
+    if jobs.empty:
+        return
+    st.markdown("#### Recent broadcasts")
+    for _, j in jobs.iterrows():
+        total = j["sent"] + j["failed"] + j["pending"]
+        done = j["sent"] + j["failed"]
+        st.progress(
+            done / total if total else 1.0,
+            text=f"#{j['id']} · {j['created_at']} · {j['status']} — "
+            f"✅ {j['sent']} sent · ❌ {j['failed']} failed · ⏳ {j['pending']} pending",
+        )
+        if j["status"] == "paused":
+            st.warning(j["error"] or "Paused.")
+            with st.form(f"resume_{j['id']}"):
+                rp = st.text_input("App Password", type="password")
+                if st.form_submit_button("Resume"):
+                    get_broadcast_worker().resume(int(j["id"]), rp)
+                    st.rerun()
+        if j["failed"]:
+            with st.expander(f"Failed recipients for #{j['id']}"):
+                st.dataframe(
+                    get_pool().read_sql(
+                        """SELECT recipient, attempts, error FROM broadcast_deliveries
+                           WHERE job_id = ? AND status = 'failed'""",
+                        params=(int(j["id"]),),
+                    ),
+                    use_container_width=True,
+                )
 
 
+def render_report_status(polling=False):
+    reports = get_report_service()
+    history = reports.history()
+    # As in render_broadcast_jobs: a full run once nothing is being built.
+    if polling and not history["status"].isin(["pending", "running"]).any():
+        st.rerun()
+    run_id = st.session_state.get("report_run")
+    if run_id is not None:
+        status, error = reports.status(run_id)
+        if status == "done":
+            st.download_button(
+                "📘 Download PDF Report",
+                lambda: reports.pdf(run_id),
+                "SNU_Research_Report.pdf",
+                mime="application/pdf",
+            )
+        elif status == "failed":
+            st.error(f"Report generation failed: {error}")
+        elif status == "expired":
+            st.info("This report is no longer stored; generate it again.")
+        else:
+            st.info(f"⏳ Preparing PDF with charts... ({status})")
+
+    if not history.empty:
+        st.markdown("#### Report history")
+        st.dataframe(history, use_container_width=True, hide_index=True)
+
+
+# --- NAVIGATION ---
+# Only the selected section is executed, so each section's queries and
+# charts run only while it is on screen.
+
+SECTIONS = {
+    "📅 Public Schedule": render_public_schedule,
+    "📊 Analytics": render_analytics,
+    "🔐 Coordinator Access": render_coordinator,
+    "🛠️ Admin Control": render_admin,
+}
+
+section = st.radio(
+    "Section",
+    list(SECTIONS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="section",
+)
+st.divider()
 
+with section_timer(section):
+    SECTIONS[section]()
 
+# --- DIAGNOSTICS ---
 
 
+with st.sidebar.expander("⚙️ Diagnostics"):
+    st.caption("Section render time (ms, last run)")
+    st.json(st.session_state["section_timings"])
+    st.caption("Database pool")
+    st.json(get_pool().stats())
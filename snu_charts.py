@@ -0,0 +1,39 @@
+"""Chart rendering for the PDF report.
+
+Lives outside the Streamlit script so these functions can be pickled into
+worker processes. Only the object-oriented Figure API on an Agg canvas is
+used, never pyplot, so every call is self-contained and safe to run
+concurrently.
+"""
+
+import io
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def render_chart(kind, labels, values, title, color, rotate=0, figsize=(8, 4)):
+    # Returns (png_bytes, seconds spent rendering).
+    start = time.perf_counter()
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    if kind == "bar":
+        positions = range(len(labels))
+        ax.bar(positions, values, color=color)
+        ax.set_xticks(list(positions))
+        ax.set_xticklabels([str(label) for label in labels], rotation=rotate)
+    else:
+        ax.plot(labels, values, marker="o", color=color)
+        ax.set_xticks(list(labels))
+        ax.tick_params(axis="x", labelrotation=rotate)
+
+    ax.set_title(title)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue(), time.perf_counter() - start